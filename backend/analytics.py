@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+# Submission rollups: one document per UTC hour and per UTC day holding the
+# submission count broken down by these fields
+ROLLUP_GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+ROLLUP_DIMENSIONS = ("service_type", "urgency", "status")
+
+
+def utc_naive(when: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware inputs accordingly"""
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when
+
+
+def bucket_start(granularity: str, when: datetime) -> datetime:
+    when = utc_naive(when).replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0) if granularity == "day" else when
+
+
+def bucket_end(granularity: str, when: datetime) -> datetime:
+    """Start of the first bucket at or after ``when``"""
+    start = bucket_start(granularity, when)
+    return start if start == utc_naive(when) else start + ROLLUP_GRANULARITIES[granularity]
+
+
+def rollup_buckets(when: datetime) -> List[Tuple[str, datetime]]:
+    """Every (granularity, bucket start) a submission created at ``when`` counts towards"""
+    return [(granularity, bucket_start(granularity, when)) for granularity in ROLLUP_GRANULARITIES]
+
+
+def rollup_amounts(record: dict, sign: int = 1) -> Dict[str, int]:
+    """$inc amounts for counting (or with ``sign=-1`` uncounting) a submission"""
+    amounts = {"total": sign}
+    for field in ROLLUP_DIMENSIONS:
+        amounts[f"{field}.{record.get(field) or 'unknown'}"] = sign
+    return amounts
+
+
+class RollupBuilder:
+    """Accumulates rollups in memory while streaming submissions, for backfills"""
+
+    def __init__(self):
+        self.rollups: Dict[Tuple[str, datetime], dict] = {}
+
+    def add(self, record: dict):
+        for key in rollup_buckets(record["created_at"]):
+            rollup = self.rollups.get(key)
+            if rollup is None:
+                rollup = self.rollups[key] = {"granularity": key[0], "bucket": key[1], "total": 0,
+                                              **{field: {} for field in ROLLUP_DIMENSIONS}}
+            rollup["total"] += 1
+            for field in ROLLUP_DIMENSIONS:
+                value = record.get(field) or "unknown"
+                rollup[field][value] = rollup[field].get(value, 0) + 1
+
+    def for_granularity(self, granularity: str) -> List[dict]:
+        return sorted((rollup for (g, _), rollup in self.rollups.items() if g == granularity),
+                      key=lambda rollup: rollup["bucket"])
+
+
+def summarize(rollups: Iterable[dict]) -> dict:
+    """Add up a range of rollups"""
+    totals = {"total": 0, **{field: {} for field in ROLLUP_DIMENSIONS}}
+    for rollup in rollups:
+        totals["total"] += rollup.get("total", 0)
+        for field in ROLLUP_DIMENSIONS:
+            for value, count in rollup.get(field, {}).items():
+                totals[field][value] = totals[field].get(value, 0) + count
+    return totals
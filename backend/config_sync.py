@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+
+class ConfigVersionWatcher:
+    """Keeps per-process config caches coherent across workers.
+
+    Config writes and seeding bump a version stamp in storage; every worker
+    follows it, through a change stream when ``watch`` is given and the
+    deployment supports one (replica sets), otherwise by polling
+    ``get_version`` every ``interval`` seconds. That interval is the
+    staleness bound. ``watch`` yields the current version once its stream is
+    open and then every new one. ``on_change`` runs whenever a new version is seen.
+    """
+
+    def __init__(self, get_version: Callable[[], Awaitable[int]], on_change: Callable[[int], Awaitable[None]],
+                 interval: float = 5.0, watch: Optional[Callable[[], AsyncIterator[int]]] = None):
+        self.get_version = get_version
+        self.on_change = on_change
+        self.interval = interval
+        self.watch = watch
+        self.version = None
+        self.mode = None
+        self.changes = 0
+        self.errors = 0
+        self._task = None
+
+    async def start(self):
+        try:
+            self.version = await self.get_version()
+        except Exception as e:
+            # Left unknown, so the first version read refreshes the caches
+            self.errors += 1
+            logging.error("Failed to read config version, will keep polling: %s", e)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _observe(self, version: int):
+        if version == self.version:
+            return
+        self.version = version
+        self.changes += 1
+        try:
+            await self.on_change(version)
+        except Exception as e:
+            self.errors += 1
+            logging.error("Failed to refresh config caches for version %s: %s", version, e)
+
+    async def _run(self):
+        if self.watch:
+            try:
+                self.mode = "change_stream"
+                async for version in self.watch():
+                    await self._observe(version)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning("Config change stream unavailable, polling every %ss: %s", self.interval, e)
+
+        self.mode = "poll"
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._observe(await self.get_version())
+            except Exception as e:
+                self.errors += 1
+                logging.error("Failed to poll config version: %s", e)
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "version": self.version, "interval": self.interval,
+                "changes": self.changes, "errors": self.errors}
@@ -1,30 +1,156 @@
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from models import *
+import asyncio
+import logging
+from pathlib import Path
 from datetime import datetime
+from models import *
+from cache import TTLCache
+from search import search_value, submission_search_fields
+from retention import RetentionPolicy, archive_record, restore_record
+from analytics import ROLLUP_GRANULARITIES, RollupBuilder, bucket_end, bucket_start, rollup_amounts, rollup_buckets, summarize, utc_naive
+from http_cache import render_json
+from serializers import service_encoder, additional_service_encoder
+from snapshots import SnapshotStore
+from config_sync import ConfigVersionWatcher
+from jobs import JobRunner
+from notifications import SEND_EMAIL_JOB, client_confirmation, notary_notification, notifications_enabled, send_email
+from storage import IndexSetupError, create_storage
+from write_behind import WriteBehindQueue
+
+# Storage backend, selected by STORAGE_BACKEND (mongo | memory). Connections
+# are opened by storage.connect() in the startup hook
+storage = create_storage()
+
+# Optional write-behind mode for contact submissions: requests are acknowledged
+# once journaled, and a background task batches them into insert_many
+contact_write_queue = None
+if os.environ.get('CONTACT_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes'):
+    contact_write_queue = WriteBehindQueue(
+        lambda records: storage.submissions.insert_many(records),
+        journal_dir=Path(os.environ.get('CONTACT_WRITE_BEHIND_JOURNAL_DIR', Path(__file__).parent / 'journal')),
+        name="contact_submissions",
+        max_batch=int(os.environ.get('CONTACT_WRITE_BEHIND_BATCH', '100')),
+        flush_interval=float(os.environ.get('CONTACT_WRITE_BEHIND_INTERVAL', '0.5')),
+        fsync=os.environ.get('CONTACT_WRITE_BEHIND_FSYNC', 'false').lower() in ('1', 'true', 'yes')
+    )
+
+# Retention: final-status submissions move to the compressed archive after
+# RETENTION_COMPLETED_DAYS, any submission after RETENTION_MAX_AGE_DAYS, and
+# unsubscribed addresses are deleted SUBSCRIPTION_INACTIVE_TTL_DAYS later (0 disables a rule)
+retention_policy = RetentionPolicy(
+    final_statuses=[status for status, targets in SUBMISSION_STATUS_TRANSITIONS.items() if not targets],
+    completed_days=int(os.environ.get('RETENTION_COMPLETED_DAYS', '90')),
+    max_age_days=int(os.environ.get('RETENTION_MAX_AGE_DAYS', '730')),
+    subscription_ttl_days=int(os.environ.get('SUBSCRIPTION_INACTIVE_TTL_DAYS', '180')),
+    batch_size=int(os.environ.get('RETENTION_BATCH_SIZE', '500'))
+)
+
+# Admin listing page sizes
+SUBMISSIONS_PAGE_SIZE = int(os.environ.get('SUBMISSIONS_PAGE_SIZE', '50'))
+SUBMISSIONS_PAGE_MAX = int(os.environ.get('SUBMISSIONS_PAGE_MAX', '500'))
+# Widest range /api/analytics/submissions serves, in buckets (a year of hours fits)
+ANALYTICS_MAX_BUCKETS = int(os.environ.get('ANALYTICS_MAX_BUCKETS', '9000'))
+
+# Idempotency-Key records are kept for a day; a duplicate arriving while the
+# original is in flight waits this long for its response before getting a 409
+IDEMPOTENCY_TTL = float(os.environ.get('IDEMPOTENCY_TTL', '86400'))
+IDEMPOTENCY_WAIT = float(os.environ.get('IDEMPOTENCY_WAIT', '10'))
+
+# Business configs change rarely, so reads are served from a small TTL cache
+# that update_business_config invalidates on write
+config_cache = TTLCache(
+    maxsize=int(os.environ.get('CONFIG_CACHE_MAXSIZE', '64')),
+    ttl=float(os.environ.get('CONFIG_CACHE_TTL', '300'))
+)
+_MISSING = object()
+
+# Snapshot name -> business config key it renders
+CONFIG_SNAPSHOTS = {
+    "business_info": "business_info",
+    "business_hours": "business_hours",
+    "business_stats": "business_stats",
+    "coverage": "coverage_areas",
+}
+
+async def _config_snapshot(key: str):
+    data = await get_business_config(key)
+    return render_json(data) if data else None
+
+async def _business_stats_snapshot():
+    return render_json(await get_business_stats())
+
+async def _services_snapshot():
+    return service_encoder.encode(await get_active_services())
+
+async def _additional_services_snapshot():
+    return additional_service_encoder.encode(await get_active_additional_services())
+
+# Snapshots rendered from the service collections rather than business configs
+SERVICE_SNAPSHOTS = ("services", "additional_pricing")
 
-# Database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'notary_service')]
+# Pre-rendered (and pre-compressed) bodies for the static read endpoints,
+# rebuilt at startup and on every config version change (update_business_config
+# and seeding bump it). Business stats come from live counters, so that snapshot
+# also expires after BUSINESS_STATS_TTL; service snapshots expire after
+# SERVICES_SNAPSHOT_TTL to pick up writes made outside the app (migrations)
+services_snapshot_ttl = float(os.environ.get('SERVICES_SNAPSHOT_TTL', '300'))
+snapshots = SnapshotStore({
+    **{name: (lambda key=key: _config_snapshot(key)) for name, key in CONFIG_SNAPSHOTS.items()},
+    "business_stats": _business_stats_snapshot,
+    "services": _services_snapshot,
+    "additional_pricing": _additional_services_snapshot,
+}, ttls={
+    "business_stats": float(os.environ.get('BUSINESS_STATS_TTL', '10')),
+    **{name: services_snapshot_ttl for name in SERVICE_SNAPSHOTS},
+})
 
-# Collections
-contact_submissions = db.contact_submissions
-services = db.services
-business_configs = db.business_configs
-testimonials = db.testimonials
-additional_services = db.additional_services
-email_subscriptions = db.email_subscriptions
+# Counter document behind /api/business/stats, kept current with $inc on every
+# submission and testimonial write; rebuild_business_stats() recomputes it
+BUSINESS_STATS_COUNTER = "business_stats"
+# A submission in this status counts as a notarized document
+NOTARIZED_STATUS = "completed"
+
+async def _refresh_config_caches(version: int):
+    names = [*CONFIG_SNAPSHOTS, *SERVICE_SNAPSHOTS]
+    config_cache.clear()
+    snapshots.invalidate(names)
+    await snapshots.rebuild(names)
+
+# Every config write bumps a version stamp in storage; each worker follows it
+# (change stream on replica sets, else polling) and drops its cached configs.
+# CONFIG_VERSION_POLL_INTERVAL bounds how stale another worker's copy can be
+config_watcher = ConfigVersionWatcher(
+    get_version=lambda: storage.configs.get_version(),
+    on_change=_refresh_config_caches,
+    interval=float(os.environ.get('CONFIG_VERSION_POLL_INTERVAL', '5')),
+    watch=(lambda: storage.configs.watch_version())
+    if os.environ.get('CONFIG_CHANGE_STREAMS', 'true').lower() in ('1', 'true', 'yes') and storage.name == "mongo"
+    else None
+)
+
+# Post-submission side effects (notification emails) go through a persisted
+# outbox drained by a background worker pool, off the request path
+job_runner = JobRunner(
+    repository=lambda: storage.jobs,
+    handlers={SEND_EMAIL_JOB: send_email},
+    concurrency=int(os.environ.get('JOB_WORKERS', '2')),
+    poll_interval=float(os.environ.get('JOB_POLL_INTERVAL', '1')),
+    lease=float(os.environ.get('JOB_LEASE', '60')),
+    timeout=float(os.environ.get('JOB_TIMEOUT', '30')),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '5')),
+    base_delay=float(os.environ.get('JOB_RETRY_BASE_DELAY', '5')),
+    max_delay=float(os.environ.get('JOB_RETRY_MAX_DELAY', '600'))
+)
 
 async def init_database():
     """Initialize database with seed data"""
     
     # Check if data already exists
-    if await services.count_documents({}) > 0:
-        print("Database already initialized")
+    if await storage.services.count() > 0:
+        logging.info("Database already initialized")
         return
     
-    print("Initializing database with seed data...")
+    logging.info("Initializing database with seed data...")
     
     # Seed services data
     services_data = [
@@ -55,7 +181,7 @@ async def init_database():
     ]
     
     for service in services_data:
-        await services.insert_one(service.dict())
+        await storage.services.insert(service.dict())
     
     # Seed business configuration
     business_info = BusinessConfig(
@@ -69,7 +195,7 @@ async def init_database():
             "service_area": "Greater New York Area & Worldwide"
         }
     )
-    await business_configs.insert_one(business_info.dict())
+    await storage.configs.insert(business_info.dict())
     
     # Business hours
     business_hours = BusinessConfig(
@@ -81,7 +207,7 @@ async def init_database():
             "weekend": "Available"
         }
     )
-    await business_configs.insert_one(business_hours.dict())
+    await storage.configs.insert(business_hours.dict())
     
     # Coverage areas
     coverage_data = BusinessConfig(
@@ -114,19 +240,18 @@ async def init_database():
             ]
         }
     )
-    await business_configs.insert_one(coverage_data.dict())
+    await storage.configs.insert(coverage_data.dict())
     
     # Business statistics
     stats_data = BusinessConfig(
         key="business_stats",
+        # documents_notarized and average_rating are computed from live counters
         data={
-            "documents_notarized": "500+",
-            "average_rating": "4.9",
             "average_session_time": "15min",
             "service_availability": "24/7"
         }
     )
-    await business_configs.insert_one(stats_data.dict())
+    await storage.configs.insert(stats_data.dict())
     
     # Seed testimonials
     testimonials_data = [
@@ -157,7 +282,7 @@ async def init_database():
     ]
     
     for testimonial in testimonials_data:
-        await testimonials.insert_one(testimonial.dict())
+        await storage.testimonials.insert(testimonial.dict())
     
     # Seed additional services
     additional_services_data = [
@@ -181,20 +306,379 @@ async def init_database():
     ]
     
     for service in additional_services_data:
-        await additional_services.insert_one(service.dict())
+        await storage.additional_services.insert(service.dict())
     
-    print("Database initialized successfully!")
+    await rebuild_business_stats()
+    # Other workers may already have rendered the empty collections
+    await storage.configs.bump_version()
+    config_cache.clear()
+    snapshots.invalidate()
+    logging.info("Database seeded")
+
+async def ensure_indexes(create: bool = True):
+    """Apply the backend's index registry and report drift. Safe to run on every startup"""
+    return await storage.ensure_indexes(create)
+
+async def dedupe_for_unique_indexes() -> dict:
+    """Repair data that predates the unique indexes, then build them"""
+    references, subscriptions = await asyncio.gather(
+        storage.submissions.dedupe_references(),
+        storage.subscriptions.dedupe_active()
+    )
+    result = {"references": references, "subscriptions": subscriptions}
+    try:
+        result["indexes"] = await ensure_indexes()
+    except IndexSetupError as e:
+        result.update(indexes=e.report, error=str(e))
+    return result
 
 # Helper functions
 async def get_business_config(key: str):
-    """Get business configuration by key"""
-    config = await business_configs.find_one({"key": key})
-    return config["data"] if config else None
+    """Get business configuration by key (cached, callers must not mutate the result)"""
+    data = config_cache.get(key, _MISSING)
+    if data is not _MISSING:
+        return data
+    data = await storage.configs.get(key)
+    config_cache.set(key, data)
+    return data
 
 async def update_business_config(key: str, data: dict):
     """Update business configuration"""
-    await business_configs.update_one(
-        {"key": key},
-        {"$set": {"data": data, "updated_at": datetime.utcnow()}},
-        upsert=True
-    )
\ No newline at end of file
+    names = [name for name, config_key in CONFIG_SNAPSHOTS.items() if config_key == key]
+    try:
+        await storage.configs.set(key, data)
+        await storage.configs.bump_version()
+    finally:
+        config_cache.invalidate(key)
+        snapshots.invalidate(names)
+    await snapshots.rebuild(names)
+
+async def get_active_services():
+    """Get active services"""
+    return await storage.services.list_active()
+
+async def get_active_additional_services():
+    """Get active additional service pricing"""
+    return await storage.additional_services.list_active()
+
+async def get_active_testimonials(limit: int = 10):
+    """Get the most recent active, verified testimonials"""
+    return await storage.testimonials.list_active(limit)
+
+async def list_contact_submissions(limit: int = SUBMISSIONS_PAGE_SIZE, cursor: str = None, **filters):
+    """Keyset-paginated submissions, newest first. Returns (documents, next_cursor)"""
+    return await storage.submissions.list_page(limit, cursor, **filters)
+
+async def search_contact_submissions(mode: str, query: str, limit: int = SUBMISSIONS_PAGE_SIZE, cursor: str = None):
+    """Indexed admin search. Returns (documents, next_cursor); ValueError for empty queries or bad cursors"""
+    return await storage.submissions.search(mode, search_value(mode, query), limit, cursor)
+
+async def backfill_submission_search_fields(batch_size: int = 500) -> dict:
+    """Store the normalized search fields on submissions that lack or have stale ones"""
+    scanned = updated = 0
+    batch = []
+    async for record in storage.submissions.iter_range():
+        scanned += 1
+        fields = submission_search_fields(record)
+        if any(record.get(field) != value for field, value in fields.items()):
+            batch.append((record["id"], fields))
+        if len(batch) >= batch_size:
+            await storage.submissions.set_fields(batch)
+            updated += len(batch)
+            batch = []
+    await storage.submissions.set_fields(batch)
+    updated += len(batch)
+    return {"scanned": scanned, "updated": updated}
+
+async def insert_contact_submission(record: dict):
+    """Insert a submission, disambiguating the reference if another request already took it"""
+    return await storage.submissions.insert(record)
+
+async def save_contact_submission(record: dict):
+    """Store a new submission (directly, or journaled for the write-behind queue) and count it (best effort)"""
+    record.update(submission_search_fields(record))
+    if contact_write_queue:
+        contact_write_queue.put(record)
+    else:
+        record = await insert_contact_submission(record)
+    # The submission is stored at this point, so failing the request would only
+    # invite a duplicate resubmission. Drift is repaired by manage.py
+    # rebuild-stats / backfill-rollups
+    results = await asyncio.gather(
+        storage.counters.increment(BUSINESS_STATS_COUNTER, {
+            "submissions": 1,
+            f"by_service.{record['service_type']}": 1,
+            f"by_status.{record['status']}": 1,
+        }),
+        storage.rollups.increment(rollup_buckets(record["created_at"]), rollup_amounts(record)),
+        return_exceptions=True
+    )
+    for name, result in zip(("business stats counters", "submission rollups"), results):
+        if isinstance(result, Exception):
+            logging.error("Failed to count submission %s in %s: %s", record['reference'], name, result)
+    return record
+
+async def update_submission_statuses(changes: List[dict]) -> List[dict]:
+    """Move submissions through the status workflow in one write, keeping the counters and rollups in step.
+
+    ``changes`` are {id, status, updated_at (optional)}. Returns one result per
+    change: updated, unchanged, conflict (modified concurrently, or stale
+    updated_at), invalid_transition or not_found.
+    """
+    current = {document["id"]: document for document in await storage.submissions.get_many([change["id"] for change in changes])}
+    # Mongo keeps milliseconds; use the same precision everywhere so returned values compare equal
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+    results, pending = [], []
+    for change in changes:
+        document = current.get(change["id"])
+        expected = utc_naive(change["updated_at"]) if change.get("updated_at") else None
+        if document is None:
+            results.append({"id": change["id"], "outcome": "not_found"})
+            continue
+        result = {"id": document["id"], "status": document["status"], "updated_at": document["updated_at"]}
+        results.append(result)
+        if expected is not None and expected != document["updated_at"]:
+            result["outcome"] = "conflict"
+        elif change["status"] == document["status"]:
+            result["outcome"] = "unchanged"
+        elif change["status"] not in SUBMISSION_STATUS_TRANSITIONS.get(document["status"], ()):
+            result["outcome"] = "invalid_transition"
+        else:
+            result["outcome"] = "conflict"  # until the write confirms it
+            pending.append((result, document, expected, change["status"]))
+
+    updated = set(await storage.submissions.transition_status(
+        [(document["id"], document["status"], expected, status) for _, document, expected, status in pending], now
+    ))
+    counters, rollups = {}, {}
+    for result, document, _, status in pending:
+        if document["id"] not in updated:
+            continue
+        amounts = {f"status.{document['status']}": -1, f"status.{status}": 1}
+        for bucket in rollup_buckets(document["created_at"]):
+            bucket_amounts = rollups.setdefault(bucket, {})
+            for path, amount in amounts.items():
+                bucket_amounts[path] = bucket_amounts.get(path, 0) + amount
+        for path, amount in amounts.items():
+            path = "by_" + path
+            counters[path] = counters.get(path, 0) + amount
+        result.update(outcome="updated", status=status, updated_at=now)
+
+    if updated:
+        # The transitions are committed; like save_contact_submission, counting is
+        # best effort and rebuild-stats / backfill-rollups repair any drift
+        counted = await asyncio.gather(
+            storage.counters.increment(BUSINESS_STATS_COUNTER, counters),
+            storage.rollups.increment_many(rollups),
+            return_exceptions=True
+        )
+        for name, result in zip(("business stats counters", "submission rollups"), counted):
+            if isinstance(result, Exception):
+                logging.error("Failed to count %d status changes in %s: %s", len(updated), name, result)
+        snapshots.invalidate(["business_stats"])
+    return results
+
+async def create_testimonial(testimonial: Testimonial):
+    """Store a testimonial and count it towards the rating statistics"""
+    document = testimonial.dict()
+    await storage.testimonials.insert(document)
+    if not document["active"]:
+        return document
+    if document["verified"]:
+        await storage.counters.increment(BUSINESS_STATS_COUNTER, {
+            "testimonials.verified": 1, "testimonials.rating_sum": document["rating"]
+        })
+    else:
+        await storage.counters.increment(BUSINESS_STATS_COUNTER, {"testimonials.pending": 1})
+    return document
+
+async def verify_testimonial(testimonial_id: str):
+    """Publish a pending testimonial. Returns None if it does not exist or is already verified"""
+    testimonial = await storage.testimonials.verify(testimonial_id)
+    if testimonial is not None and testimonial.get("active"):
+        await storage.counters.increment(BUSINESS_STATS_COUNTER, {
+            "testimonials.pending": -1, "testimonials.verified": 1, "testimonials.rating_sum": testimonial["rating"]
+        })
+    return testimonial
+
+async def rebuild_business_stats() -> dict:
+    """Recompute the stats counters from the collections (full scans; increments racing with it may be lost)"""
+    by_service, by_status, archived_by_service, archived_by_status, testimonials = await asyncio.gather(
+        storage.submissions.count_by("service_type"),
+        storage.submissions.count_by("status"),
+        storage.submission_archive.count_by("service_type"),
+        storage.submission_archive.count_by("status"),
+        storage.testimonials.rating_summary()
+    )
+    # Archived submissions still count
+    for counts, archived in ((by_service, archived_by_service), (by_status, archived_by_status)):
+        for value, count in archived.items():
+            counts[value] = counts.get(value, 0) + count
+    counters = {
+        "submissions": sum(by_status.values()),
+        "by_service": by_service,
+        "by_status": by_status,
+        "testimonials": testimonials,
+    }
+    await storage.counters.replace(BUSINESS_STATS_COUNTER, counters)
+    return counters
+
+async def get_business_stats() -> dict:
+    """Business stats from the counters document plus the descriptive fields of the business_stats config"""
+    counters = await storage.counters.get(BUSINESS_STATS_COUNTER)
+    if counters is None:
+        counters = await rebuild_business_stats()
+    config = await get_business_config("business_stats") or {}
+    testimonials = counters.get("testimonials", {})
+    verified = testimonials.get("verified", 0)
+    return BusinessStats(
+        documents_notarized=f"{counters.get('by_status', {}).get(NOTARIZED_STATUS, 0):,}",
+        average_rating=f"{testimonials.get('rating_sum', 0) / verified:.1f}" if verified else "-",
+        average_session_time=config.get("average_session_time", "-"),
+        service_availability=config.get("service_availability", "-"),
+        total_submissions=counters.get("submissions", 0),
+        submissions_by_service=counters.get("by_service", {}),
+        verified_testimonials=verified
+    ).model_dump()
+
+async def subscribe_email_address(email: str, source: str) -> bool:
+    """Atomically subscribe an address. Returns False if it already had an active subscription"""
+    return await storage.subscriptions.subscribe(EmailSubscription(email=email, source=source).dict())
+
+async def bulk_subscribe_email_addresses(emails: List[str], source: str) -> List[str]:
+    """Subscribe many addresses in one write, returning an outcome per address"""
+    return await storage.subscriptions.bulk_subscribe(
+        [EmailSubscription(email=email, source=source).dict() for email in emails]
+    )
+
+async def enqueue_submission_notifications(record: dict):
+    """Queue the notary notification and client confirmation emails for a new submission"""
+    if not notifications_enabled():
+        return
+    business = await get_business_config("business_info")
+    notary_email = os.environ.get('NOTARY_NOTIFICATION_EMAIL') or (business or {}).get("email")
+    emails = [client_confirmation(record, business)]
+    if notary_email:
+        emails.insert(0, notary_notification(record, notary_email))
+    await job_runner.enqueue(SEND_EMAIL_JOB, emails)
+
+async def backfill_submission_rollups(start: datetime = None, end: datetime = None) -> dict:
+    """Recompute the submission rollups for whole days in [start, end) by streaming the submissions (archived too).
+
+    Buckets in the range are replaced, so submissions arriving while it runs
+    may be lost from (or double counted in) them; backfill closed ranges. By
+    default the range ends at the start of today, which is still being written.
+    """
+    end = bucket_end("day", end) if end else bucket_start("day", datetime.utcnow())
+    start = bucket_start("day", start) if start else datetime.min
+    builder = RollupBuilder()
+    submissions = 0
+    for source in (storage.submissions, storage.submission_archive):
+        async for record in source.iter_range(start, end):
+            builder.add(record)
+            submissions += 1
+    buckets = {}
+    for granularity in ROLLUP_GRANULARITIES:
+        rollups = builder.for_granularity(granularity)
+        await storage.rollups.replace_range(granularity, start, end, rollups)
+        buckets[granularity] = len(rollups)
+    return {"start": start if start != datetime.min else None, "end": end, "submissions": submissions, "buckets": buckets}
+
+async def get_submission_analytics(granularity: str, start: datetime, end: datetime) -> dict:
+    """Submission volume per bucket overlapping [start, end), read from the rollups. Empty buckets are omitted"""
+    start, end = bucket_start(granularity, start), bucket_end(granularity, end)
+    rollups = await storage.rollups.list_range(granularity, start, end)
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "totals": summarize(rollups),
+        "buckets": rollups,
+    }
+
+async def retention_report() -> dict:
+    """Dry run of apply_retention: what would be archived or expired, and the space it frees.
+
+    Compresses every candidate to report exact sizes. Bytes are BSON sizes; the
+    storage engine's own block compression makes on-disk savings smaller.
+    """
+    now = datetime.utcnow()
+    completed_before, created_before = retention_policy.cutoffs(now)
+    submissions = {"count": 0, "by_status": {}, "document_bytes": 0, "archived_bytes": 0}
+    async for document in storage.submissions.retention_candidates(
+        retention_policy.final_statuses, completed_before, created_before
+    ):
+        record = archive_record(document, now)
+        submissions["count"] += 1
+        submissions["by_status"][record["status"]] = submissions["by_status"].get(record["status"], 0) + 1
+        submissions["document_bytes"] += record["raw_size"]
+        submissions["archived_bytes"] += record["size"]
+    submissions["freed_bytes"] = submissions["document_bytes"] - submissions["archived_bytes"]
+
+    subscriptions = await storage.subscriptions.retention_counts()
+    if retention_policy.subscription_ttl:
+        subscriptions["to_schedule"] = await storage.subscriptions.schedule_expiry(retention_policy.subscription_ttl, dry_run=True)
+    return {
+        "dry_run": True,
+        "policy": retention_policy.describe(),
+        "cutoffs": {"completed_before": completed_before, "created_before": created_before},
+        "submissions": submissions,
+        "subscriptions": subscriptions,
+        "archive": await storage.submission_archive.stats(),
+    }
+
+async def apply_retention(max_batches: int = 0) -> dict:
+    """Move due submissions to the archive in batches and schedule inactive subscriptions for expiry.
+
+    Each batch is copied to the archive before the originals are deleted, and a
+    submission modified in between is kept (its archive copy is dropped), so an
+    interrupted run is safe to repeat.
+    """
+    now = datetime.utcnow()
+    completed_before, created_before = retention_policy.cutoffs(now)
+    archived = kept = batches = 0
+    while not max_batches or batches < max_batches:
+        documents = [document async for document in storage.submissions.retention_candidates(
+            retention_policy.final_statuses, completed_before, created_before, limit=retention_policy.batch_size
+        )]
+        if not documents:
+            break
+        await storage.submission_archive.store([archive_record(document, now) for document in documents])
+        deleted = set(await storage.submissions.delete_unchanged(documents))
+        await storage.submission_archive.remove([document["id"] for document in documents if document["id"] not in deleted])
+        archived += len(deleted)
+        kept += len(documents) - len(deleted)
+        batches += 1
+        logging.info("Retention batch %s: archived %s of %s submissions", batches, len(deleted), len(documents))
+        if not deleted:
+            break  # everything left changed under us; try again next run
+
+    scheduled = 0
+    if retention_policy.subscription_ttl:
+        scheduled = await storage.subscriptions.schedule_expiry(retention_policy.subscription_ttl)
+    return {
+        "dry_run": False,
+        "submissions": {"archived": archived, "kept_modified": kept, "batches": batches},
+        "subscriptions": {"scheduled_to_expire": scheduled},
+        "archive": await storage.submission_archive.stats(),
+    }
+
+async def get_archived_submission(reference: str) -> Optional[dict]:
+    """An archived submission by reference, decompressed"""
+    record = await storage.submission_archive.get_by_reference(reference)
+    return restore_record(record) if record else None
+
+async def unsubscribe_email_address(email: str) -> bool:
+    """Deactivate an address; it is deleted once the inactive subscription TTL passes"""
+    ttl = retention_policy.subscription_ttl
+    return await storage.subscriptions.unsubscribe(email, datetime.utcnow() + ttl if ttl else None)
+
+def iter_contact_submissions(start: datetime = None, end: datetime = None, batch_size: int = 1000):
+    """Stream submissions created in [start, end) oldest first, without materialising them"""
+    return storage.submissions.iter_range(start and utc_naive(start), end and utc_naive(end), batch_size)
+
+def iter_email_subscriptions(start: datetime = None, end: datetime = None, batch_size: int = 1000):
+    """Stream subscriptions made in [start, end) oldest first, without materialising them"""
+    return storage.subscriptions.iter_range(start and utc_naive(start), end and utc_naive(end), batch_size)
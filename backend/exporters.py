@@ -0,0 +1,139 @@
+import io
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, List
+
+# Rows are buffered per chunk so each yielded block amortises the per-write overhead
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+SUBMISSION_EXPORT_FIELDS = [
+    "id", "reference", "status", "name", "email", "phone", "service_type",
+    "document_type", "preferred_date", "message", "urgency", "created_at", "updated_at",
+]
+SUBSCRIPTION_EXPORT_FIELDS = ["id", "email", "source", "active", "subscribed_at"]
+
+TIMESTAMP_FIELDS = {"created_at", "updated_at", "subscribed_at"}
+BOOLEAN_FIELDS = {"active"}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def _chunks(documents: AsyncIterable[dict]) -> AsyncIterator[List[dict]]:
+    chunk = []
+    async for document in documents:
+        chunk.append(document)
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def export_ndjson(documents: AsyncIterable[dict], fields: List[str]) -> AsyncIterator[bytes]:
+    """One JSON object per line"""
+    async for chunk in _chunks(documents):
+        lines = [
+            json.dumps({field: document.get(field) for field in fields}, default=_json_default)
+            for document in chunk
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# Spreadsheet apps evaluate cells starting with these as formulas (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def export_csv(documents: AsyncIterable[dict], fields: List[str]) -> AsyncIterator[bytes]:
+    """CSV with a header row; text that a spreadsheet would run as a formula is prefixed with '"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    async for chunk in _chunks(documents):
+        for document in chunk:
+            writer.writerow({field: _csv_cell(value) for field, value in document.items()})
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object the Parquet writer appends to; drained after every row group"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def export_parquet(documents: AsyncIterable[dict], fields: List[str]) -> AsyncIterator[bytes]:
+    """Parquet file written one row group per chunk (requires pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (field, pa.timestamp("ms") if field in TIMESTAMP_FIELDS
+         else pa.bool_() if field in BOOLEAN_FIELDS else pa.string())
+        for field in fields
+    ])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for chunk in _chunks(documents):
+            columns = {field: [document.get(field) for document in chunk] for field in fields}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORTERS = {
+    "ndjson": export_ndjson,
+    "csv": export_csv,
+    "parquet": export_parquet,
+}
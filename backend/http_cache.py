@@ -0,0 +1,51 @@
+import os
+import hashlib
+from typing import Any
+from fastapi import Request, Response
+from pydantic_core import to_json
+
+# Cache-Control settings for read-only endpoints
+CACHE_MAX_AGE = int(os.environ.get('CACHE_MAX_AGE', '60'))
+CACHE_STALE_WHILE_REVALIDATE = int(os.environ.get('CACHE_STALE_WHILE_REVALIDATE', '300'))
+CACHE_CONTROL = os.environ.get(
+    'CACHE_CONTROL',
+    f"public, max-age={CACHE_MAX_AGE}, stale-while-revalidate={CACHE_STALE_WHILE_REVALIDATE}"
+)
+
+
+def render_json(content: Any) -> bytes:
+    """Encode a response payload to compact JSON bytes, passing pre-encoded bytes through"""
+    if isinstance(content, bytes):
+        return content
+    return to_json(content)
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body, so it changes whenever the data does"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against ``etag`` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cacheable_response(request: Request, content: Any, cache_control: str = CACHE_CONTROL) -> Response:
+    """JSON response carrying ETag/Cache-Control headers, or a bodyless 304 if the client copy is current"""
+    body = render_json(content)
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
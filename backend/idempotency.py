@@ -0,0 +1,67 @@
+import json
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Tuple
+from storage import IdempotencyRepository, IDEMPOTENCY_COMPLETED
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyError(Exception):
+    """A request cannot be processed under its Idempotency-Key"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def request_fingerprint(payload) -> str:
+    """Stable digest of a JSON-compatible payload, used to detect a key reused for a different request"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+async def run_idempotent(
+    repository: IdempotencyRepository,
+    key: str,
+    fingerprint: str,
+    handler: Callable[[], Awaitable[dict]],
+    ttl: float = 86400,
+    wait: float = 10.0,
+    poll_interval: float = 0.1,
+) -> Tuple[dict, bool]:
+    """Run ``handler`` at most once per key and return (response, replayed).
+
+    The first request reserves the key; a retry after it completed gets the
+    stored response. A duplicate that arrives while the first is still in
+    flight waits up to ``wait`` seconds for its result, then gets a 409. If the
+    handler fails the reservation is released so the client can retry.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    record = await repository.reserve(key, fingerprint, ttl)
+    if record is None:
+        try:
+            response = await handler()
+        except BaseException:
+            await repository.release(key)
+            raise
+        await repository.complete(key, response)
+        return response, False
+
+    deadline = asyncio.get_running_loop().time() + wait
+    while True:
+        if record["fingerprint"] != fingerprint:
+            raise IdempotencyError(422, "Idempotency-Key was already used with a different request")
+        if record["status"] == IDEMPOTENCY_COMPLETED:
+            return record["response"], True
+        if asyncio.get_running_loop().time() >= deadline:
+            raise IdempotencyError(409, "A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(poll_interval)
+        record = await repository.get(key)
+        if record is None:
+            # The original request failed and released the key; take it over
+            return await run_idempotent(repository, key, fingerprint, handler, ttl,
+                                        max(0.0, deadline - asyncio.get_running_loop().time()), poll_interval)
@@ -0,0 +1,73 @@
+import os
+import time
+import threading
+
+# Crockford base32, the ULID alphabet: sorts lexicographically in time order
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+RANDOM_BITS = 80
+RANDOM_MAX = (1 << RANDOM_BITS) - 1
+
+
+def encode_ulid(value: int) -> str:
+    """Encode a 128-bit integer as 26 Crockford base32 characters"""
+    chars = []
+    for _ in range(26):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def ulid_timestamp(ulid: str) -> int:
+    """Millisecond timestamp embedded in a ULID"""
+    value = 0
+    for char in ulid[:10]:
+        value = (value << 5) | ALPHABET.index(char)
+    return value
+
+
+class ULIDGenerator:
+    """Monotonic ULID generator: 48-bit millisecond timestamp + 80 random bits.
+
+    Within one millisecond (or if the clock steps back) the random part is
+    incremented instead of redrawn, so ids from one process are strictly
+    increasing. Separate workers draw independent random parts, which keeps
+    collisions across processes negligible while ids stay k-sorted by time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._last_ms = 0
+        self._last_random = 0
+
+    def new(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = int.from_bytes(os.urandom(10), "big")
+            elif self._last_random < RANDOM_MAX:
+                self._last_random += 1
+            else:
+                # Random space for this millisecond is exhausted, borrow the next one
+                self._last_ms += 1
+                self._last_random = int.from_bytes(os.urandom(10), "big")
+            return encode_ulid((self._last_ms << RANDOM_BITS) | self._last_random)
+
+
+_generator = ULIDGenerator()
+# Forked workers must not continue the parent's sequence
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_generator._reset)
+
+
+def new_id() -> str:
+    """Time-sortable unique id for new documents"""
+    return _generator.new()
+
+
+def new_reference() -> str:
+    """Customer-facing request reference"""
+    return f"REQ-{_generator.new()}"
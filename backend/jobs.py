@@ -0,0 +1,116 @@
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+from models import OutboxJob
+from log_config import request_id_var
+from storage import JobRepository
+
+
+class JobRunner:
+    """Worker pool draining the persisted job outbox.
+
+    Jobs are claimed with a lease, so delivery is at-least-once: a job whose
+    worker crashed becomes claimable again when ``lease`` expires. Failures are
+    retried with exponential backoff and jitter; a job that fails
+    ``max_attempts`` times is dead-lettered. Handlers receive the job payload.
+    """
+
+    def __init__(self, repository: Callable[[], JobRepository], handlers: Dict[str, Callable[[dict], Awaitable[None]]],
+                 concurrency: int = 2, poll_interval: float = 1.0, lease: float = 60.0, timeout: float = 30.0,
+                 max_attempts: int = 5, base_delay: float = 5.0, max_delay: float = 600.0):
+        self.repository = repository
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._wake = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    async def enqueue(self, job_type: str, payloads: List[dict]):
+        """Persist one job per payload and wake the workers"""
+        jobs = [
+            OutboxJob(type=job_type, payload=payload, max_attempts=self.max_attempts, request_id=request_id_var.get()).dict()
+            for payload in payloads
+        ]
+        await self.repository().enqueue(jobs)
+        self._wake.set()
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel the workers. Jobs they were running are retried after their lease expires"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self.repository().claim(self.lease)
+            except Exception as e:
+                logging.error("Failed to claim job: %s", e)
+                job = None
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Log lines about the job carry the correlation ID of the request that queued it
+            token = request_id_var.set(job.get("request_id") or job["id"])
+            try:
+                await self._run(job)
+            except Exception as e:
+                # The lease expires and another worker picks the job up again
+                logging.error("Failed to record outcome of job %s: %s", job['id'], e)
+            finally:
+                request_id_var.reset(token)
+
+    async def _run(self, job: dict):
+        repository = self.repository()
+        handler = self.handlers.get(job["type"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job type {job['type']}")
+            await asyncio.wait_for(handler(job["payload"]), self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            if job["attempts"] >= job.get("max_attempts", self.max_attempts) or handler is None:
+                logging.error("Job %s (%s) dead-lettered after %s attempts: %s", job['id'], job['type'], job['attempts'], error)
+                await repository.dead_letter(job["id"], error)
+                self.dead_lettered += 1
+            else:
+                delay = self.retry_delay(job["attempts"])
+                logging.warning("Job %s (%s) failed, retrying in %.1fs: %s", job['id'], job['type'], delay, error)
+                await repository.retry(job["id"], datetime.utcnow() + timedelta(seconds=delay), error)
+                self.retried += 1
+            return
+        await repository.complete(job["id"])
+        self.completed += 1
+
+    async def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "outbox": await self.repository().counts(),
+        }
@@ -0,0 +1,155 @@
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from ids import new_id
+
+# Correlation ID of the request (or background job) being handled. Motor copies
+# the context into its executor threads, so driver-side log lines carry it too
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Loggers that come with their own (synchronous) handlers and propagate=False;
+# configure_logging() sends them through the queue like everything else
+ROUTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current correlation ID; runs in the thread that logs"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves %-formatting to the listener thread.
+
+    The stock prepare() renders the message on the logging thread, i.e. the
+    event loop; here only a copy of the record is queued. Log arguments should
+    therefore not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        if record.exc_info and not record.exc_text:
+            # Tracebacks must be rendered while the frames are still intact
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record):
+        if not getattr(record, "request_id", None):
+            record.request_id = "-"
+        return super().format(record)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@atexit.register
+def _stop_listener():
+    """Flush and stop the current listener. Registered once, so a replaced listener is never stopped twice"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json"):
+    """Route all logging through a queue drained by a background thread writing to stderr.
+
+    Call once at startup; calling again replaces the previous pipeline.
+    """
+    global _listener
+    _stop_listener()
+
+    output = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(_TextFormatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    # uvicorn configures its loggers before importing the app, so this runs after
+    for name in ROUTED_LOGGERS:
+        routed = logging.getLogger(name)
+        for existing in list(routed.handlers):
+            routed.removeHandler(existing)
+        routed.propagate = True
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    return _listener
+
+
+class RequestIdMiddleware:
+    """ASGI middleware giving every request a correlation ID.
+
+    An incoming X-Request-ID is reused (so IDs can span services), otherwise a
+    new one is generated; either way it is echoed in the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1").strip()
+                if 0 < len(candidate) <= MAX_REQUEST_ID_LENGTH and candidate.isprintable():
+                    request_id = candidate
+                break
+        request_id = request_id or new_id()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the backend, run against the configured storage:
+
+    python manage.py rebuild-stats
+    python manage.py backfill-rollups [--start 2024-01-01] [--end 2024-07-01]
+    python manage.py backfill-search-fields
+    python manage.py retention [--dry-run] [--max-batches N]
+    python manage.py dedupe
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from log_config import configure_logging
+from database import *
+
+
+async def rebuild_stats(args):
+    """Recompute the business stats counters from the collections"""
+    return await rebuild_business_stats()
+
+
+async def backfill_rollups(args):
+    """Recompute the hourly and daily submission rollups for whole days in [start, end)"""
+    return await backfill_submission_rollups(args.start, args.end)
+
+
+async def backfill_search_fields(args):
+    """Store the normalized name/email/phone search fields on older submissions"""
+    return await backfill_submission_search_fields()
+
+
+async def retention(args):
+    """Archive due submissions and schedule inactive subscriptions for expiry (see RETENTION_* settings)"""
+    if args.dry_run:
+        return await retention_report()
+    return await apply_retention(args.max_batches)
+
+
+async def dedupe(args):
+    """Fix duplicate submission references and active subscriptions, then build the unique indexes"""
+    return await dedupe_for_unique_indexes()
+
+
+COMMANDS = {
+    "rebuild-stats": rebuild_stats,
+    "backfill-rollups": backfill_rollups,
+    "backfill-search-fields": backfill_search_fields,
+    "retention": retention,
+    "dedupe": dedupe,
+}
+
+
+async def run(args):
+    await storage.connect()
+    try:
+        return await COMMANDS[args.command](args)
+    finally:
+        await storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild-stats", help=rebuild_stats.__doc__)
+    backfill = commands.add_parser("backfill-rollups", help=backfill_rollups.__doc__)
+    backfill.add_argument("--start", type=datetime.fromisoformat, help="UTC date or datetime (default: first submission)")
+    backfill.add_argument("--end", type=datetime.fromisoformat, help="UTC date or datetime (default: start of today, whose buckets are still open)")
+    commands.add_parser("backfill-search-fields", help=backfill_search_fields.__doc__)
+    retention_parser = commands.add_parser("retention", help=retention.__doc__)
+    retention_parser.add_argument("--dry-run", action="store_true", help="only report what would move and the space freed")
+    retention_parser.add_argument("--max-batches", type=int, default=0, help="stop after N batches (default: until done)")
+    commands.add_parser("dedupe", help=dedupe.__doc__)
+    args = parser.parse_args()
+
+    configure_logging(os.environ.get('LOG_LEVEL', 'INFO'), os.environ.get('LOG_FORMAT', 'text'))
+    result = asyncio.run(run(args))
+    json.dump(result, sys.stdout, indent=2, default=str)
+    print()
+
+
+if __name__ == "__main__":
+    main()
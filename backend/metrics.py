@@ -0,0 +1,292 @@
+import time
+import logging
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+from pymongo import monitoring
+
+logger = logging.getLogger("mongo")
+
+# Seconds; covers sub-millisecond cache hits up to slow Mongo round trips
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect and two additions under a lock"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # per-bucket counts (+Inf last), sum, count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        for label_values, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+def sample(name: str, help: str, type: str, value) -> List[str]:
+    """Exposition lines for a single unlabelled value, for use in collectors"""
+    return [f"# HELP {name} {help}", f"# TYPE {name} {type}", f"{name} {value}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], List[str]]):
+        """Register a callback producing extra exposition lines at scrape time"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status")
+)
+http_errors = registry.counter(
+    "http_request_errors_total", "HTTP requests that failed with a 5xx or an unhandled exception", ("method", "route")
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+mongo_latency = registry.histogram(
+    "mongo_command_duration_seconds", "Mongo command latency by collection and command", ("collection", "command")
+)
+mongo_failures = registry.counter(
+    "mongo_command_failures_total", "Failed Mongo commands by collection and command", ("collection", "command")
+)
+rate_limit_rejections = registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter by route and key type", ("route", "key")
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request counts, errors and latency"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # Label by route template, never the raw path, to keep cardinality bounded
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method, template, str(status))
+            http_latency.observe(elapsed, method, template)
+            if status >= 500:
+                http_errors.inc(method, template)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding per-collection timings into the registry"""
+
+    def __init__(self):
+        self._inflight: Dict[tuple, str] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        if isinstance(collection, str):
+            self._inflight[(event.request_id, event.connection_id)] = collection
+
+    def succeeded(self, event):
+        collection = self._inflight.pop((event.request_id, event.connection_id), "-")
+        mongo_latency.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._inflight.pop((event.request_id, event.connection_id), "-")
+        mongo_latency.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_failures.inc(collection, event.command_name)
+        # Runs on the driver's thread with the request's context, so the line carries its correlation ID
+        logger.warning("Mongo %s on %s failed after %.1fms: %s", event.command_name, collection,
+                       event.duration_micros / 1000, event.failure.get("errmsg", event.failure))
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """pymongo pool listener tracking open, checked out and waiting connections per server"""
+
+    def __init__(self):
+        self._pools: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, address) -> dict:
+        key = f"{address[0]}:{address[1]}"
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {"max_pool_size": 0, "open": 0, "checked_out": 0, "waiting": 0, "checkout_failures": 0}
+        return pool
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for field, delta in deltas.items():
+                pool[field] += delta
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)["max_pool_size"] = event.options.get("maxPoolSize", 100)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._update(event.address, waiting=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, checked_out=-1)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Per-server pool usage; saturation is checked out / max pool size"""
+        with self._lock:
+            pools = {address: dict(pool) for address, pool in self._pools.items()}
+        for pool in pools.values():
+            pool["saturation"] = round(pool["checked_out"] / pool["max_pool_size"], 3) if pool["max_pool_size"] else 0.0
+        return pools
+
+
+mongo_pool_metrics = MongoPoolMetrics()
+
+
+@registry.collector
+def collect_pool_metrics():
+    pools = mongo_pool_metrics.snapshot()
+    if not pools:
+        return []
+    lines = []
+    for name, field, help in (
+        ("mongo_pool_connections", "open", "Open connections per server"),
+        ("mongo_pool_checked_out", "checked_out", "Connections in use per server"),
+        ("mongo_pool_wait_queue", "waiting", "Operations waiting for a connection per server"),
+        ("mongo_pool_max_size", "max_pool_size", "Configured maxPoolSize per server"),
+    ):
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{_format_labels(('address',), (address,))} {pool[field]}" for address, pool in sorted(pools.items())]
+    lines += ["# HELP mongo_pool_checkout_failures_total Failed connection checkouts per server",
+              "# TYPE mongo_pool_checkout_failures_total counter"]
+    lines += [f"mongo_pool_checkout_failures_total{_format_labels(('address',), (address,))} {pool['checkout_failures']}"
+              for address, pool in sorted(pools.items())]
+    return lines
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, AfterValidator, BeforeValidator
+from typing import Annotated, List, Optional, Dict, Any
 from datetime import datetime
-import uuid
+from ids import new_id, new_reference
 
 # Contact submission model
 class ContactSubmissionCreate(BaseModel):
@@ -15,15 +15,48 @@ class ContactSubmissionCreate(BaseModel):
     urgency: str = Field(default="normal", pattern="^(normal|rush)$")
 
 class ContactSubmission(ContactSubmissionCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     status: str = Field(default="new")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    reference: str = Field(default_factory=lambda: f"REQ-{int(datetime.utcnow().timestamp())}")
+    reference: str = Field(default_factory=new_reference)
+
+# Submission status workflow: new -> contacted -> scheduled -> completed, and
+# any open submission can be cancelled. completed and cancelled are final
+SUBMISSION_STATUS_TRANSITIONS = {
+    "new": ("contacted", "cancelled"),
+    "contacted": ("scheduled", "cancelled"),
+    "scheduled": ("completed", "cancelled"),
+    "completed": (),
+    "cancelled": (),
+}
+SUBMISSION_STATUS_PATTERN = "^(new|contacted|scheduled|completed|cancelled)$"
+
+class SubmissionStatusUpdate(BaseModel):
+    status: str = Field(..., pattern=SUBMISSION_STATUS_PATTERN)
+    # Optimistic check: the updated_at the admin last saw. Without it the update
+    # is still conditional on the status read just before writing
+    updated_at: Optional[datetime] = None
+
+class SubmissionStatusChange(SubmissionStatusUpdate):
+    id: str
+
+class BulkStatusUpdateRequest(BaseModel):
+    updates: List[SubmissionStatusChange] = Field(..., min_length=1, max_length=1000)
+
+class SubmissionStatusResult(BaseModel):
+    id: str
+    outcome: str  # updated | unchanged | conflict | invalid_transition | not_found
+    status: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class BulkStatusUpdateResponse(BaseModel):
+    counts: Dict[str, int]
+    results: List[SubmissionStatusResult]
 
 # Service model
 class Service(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     base_price: Optional[float] = None
     description: str
@@ -37,7 +70,7 @@ class ServiceResponse(Service):
 
 # Business configuration model
 class BusinessConfig(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     key: str
     data: Dict[str, Any]
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -51,14 +84,14 @@ class TestimonialCreate(BaseModel):
     date: str
 
 class Testimonial(TestimonialCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     verified: bool = Field(default=False)
     active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Additional service pricing model
 class AdditionalService(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     service: str
     price: float
     unit: Optional[str] = None
@@ -97,14 +130,86 @@ class BusinessStats(BaseModel):
     average_rating: str
     average_session_time: str
     service_availability: str
+    total_submissions: int = 0
+    submissions_by_service: Dict[str, int] = Field(default_factory=dict)
+    verified_testimonials: int = 0
+
+# Submission analytics, read from the hourly/daily rollups
+class SubmissionCounts(BaseModel):
+    total: int = 0
+    service_type: Dict[str, int] = Field(default_factory=dict)
+    urgency: Dict[str, int] = Field(default_factory=dict)
+    status: Dict[str, int] = Field(default_factory=dict)
+
+class SubmissionRollup(SubmissionCounts):
+    bucket: datetime
+
+class SubmissionAnalytics(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    totals: SubmissionCounts
+    buckets: List[SubmissionRollup]
 
 # Email subscription model
+def _strip(value):
+    return value.strip() if isinstance(value, str) else value
+
+# Subscription addresses are trimmed and lowercased before they are stored or
+# looked up, so "one active subscription per address" ignores case
+SubscriptionEmail = Annotated[EmailStr, BeforeValidator(_strip), AfterValidator(str.lower)]
+
 class EmailSubscription(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    email: EmailStr
+    id: str = Field(default_factory=new_id)
+    email: SubscriptionEmail
     subscribed_at: datetime = Field(default_factory=datetime.utcnow)
     source: str = Field(default="faq_page")
     active: bool = Field(default=True)
+    unsubscribed_at: Optional[datetime] = None
+
+# Background job outbox model
+class OutboxJob(BaseModel):
+    id: str = Field(default_factory=new_id)
+    type: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    status: str = Field(default="pending")  # pending | running | done | dead
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    request_id: Optional[str] = None  # correlation ID of the request that queued it
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ContactSubmissionPage(BaseModel):
+    items: List[ContactSubmission]
+    next_cursor: Optional[str] = None
+
+class LandingResponse(BaseModel):
+    """Landing page bootstrap payload, sections that failed to load are null"""
+    business_info: Optional[Dict[str, Any]] = None
+    business_hours: Optional[Dict[str, Any]] = None
+    business_stats: Optional[Dict[str, Any]] = None
+    services: Optional[List[ServiceResponse]] = None
+    additional_pricing: Optional[List[AdditionalService]] = None
+    coverage: Optional[Dict[str, Any]] = None
+    testimonials: Optional[List[Testimonial]] = None
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+class BulkSubscribeRequest(BaseModel):
+    emails: List[str] = Field(..., min_length=1, max_length=10000)
+    source: str = Field(default="partner", max_length=100)
+
+class BulkSubscribeResult(BaseModel):
+    email: str
+    outcome: str  # subscribed | already_subscribed | duplicate | invalid | error
+
+class BulkSubscribeResponse(BaseModel):
+    success: bool
+    counts: Dict[str, int]
+    results: List[BulkSubscribeResult]
+
 class ContactSubmissionResponse(BaseModel):
     success: bool
     message: str
@@ -0,0 +1,100 @@
+import os
+import ssl
+import asyncio
+import smtplib
+from email.message import EmailMessage
+from typing import Optional
+
+# Outgoing mail. Notifications are only queued when SMTP_HOST is set; for local
+# testing point it at a stand-in such as `python -m aiosmtpd -n -l localhost:1025`
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '25'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_SECURITY = os.environ.get('SMTP_SECURITY', 'none').lower()  # none | starttls | ssl
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', '10'))
+# Must be an address the SMTP relay may send as; replies go to Reply-To instead
+SMTP_FROM = os.environ.get('SMTP_FROM') or 'no-reply@i-notarize-online.com'
+
+SEND_EMAIL_JOB = "send_email"
+
+SERVICE_NAMES = {"remote": "Remote Online Notarization", "mobile": "Mobile Notary Service", "bulk": "Bulk Services"}
+
+
+def notifications_enabled() -> bool:
+    return bool(SMTP_HOST)
+
+
+def _header_text(value: str) -> str:
+    """Client input placed in a header: line breaks would be rejected (or inject headers)"""
+    return " ".join(str(value).split())
+
+
+def notary_notification(record: dict, to: str) -> dict:
+    """Email payload telling the notary about a new submission"""
+    lines = [
+        f"New {record.get('urgency', 'normal')} request {record['reference']}",
+        "",
+        f"Name: {record['name']}",
+        f"Email: {record['email']}",
+        f"Phone: {record['phone']}",
+        f"Service: {SERVICE_NAMES.get(record['service_type'], record['service_type'])}",
+        f"Document: {record.get('document_type') or '-'}",
+        f"Preferred date: {record.get('preferred_date') or '-'}",
+        "",
+        record.get('message') or "",
+    ]
+    return {
+        "to": to,
+        "reply_to": record["email"],
+        "subject": f"[{record['reference']}] New notary request from {_header_text(record['name'])}",
+        "body": "\n".join(lines).rstrip() + "\n",
+    }
+
+
+def client_confirmation(record: dict, business: Optional[dict]) -> dict:
+    """Email payload confirming receipt of a submission to the client"""
+    business = business or {}
+    name = business.get("business_name", "i-Notarize-Online")
+    estimate = "within 1 hour" if record.get("urgency") == "rush" else "within 2 hours"
+    body = (
+        f"Hi {record['name']},\n\n"
+        f"Thank you for contacting {name}. We received your request for "
+        f"{SERVICE_NAMES.get(record['service_type'], record['service_type'])} and will contact you {estimate} "
+        f"to confirm your appointment.\n\n"
+        f"Your reference number is {record['reference']}.\n"
+    )
+    if business.get("phone"):
+        body += f"\nFor urgent questions call {business['phone']}.\n"
+    return {
+        "to": record["email"],
+        "reply_to": business.get("email"),
+        "subject": f"We received your request ({record['reference']})",
+        "body": body,
+    }
+
+
+def _send(payload: dict):
+    message = EmailMessage()
+    message["From"] = SMTP_FROM
+    message["To"] = payload["to"]
+    if payload.get("reply_to"):
+        message["Reply-To"] = payload["reply_to"]
+    message["Subject"] = payload["subject"]
+    message.set_content(payload["body"])
+
+    if SMTP_SECURITY == "ssl":
+        smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT, context=ssl.create_default_context())
+    else:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    with smtp:
+        if SMTP_SECURITY == "starttls":
+            smtp.starttls(context=ssl.create_default_context())
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD or "")
+        smtp.send_message(message)
+
+
+async def send_email(payload: dict):
+    """Job handler: deliver one email. smtplib blocks, so it runs in a worker thread"""
+    await asyncio.to_thread(_send, payload)
@@ -0,0 +1,47 @@
+import json
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Opaque continuation token for the (created_at, id) keyset"""
+    raw = json.dumps({"c": created_at.isoformat(), "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor, raises ValueError on malformed tokens"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(raw["c"]), str(raw["i"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_key_cursor(key: str, id: str) -> str:
+    """Continuation token for a (key, id) keyset, e.g. ascending prefix search results"""
+    raw = json.dumps({"k": key, "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_key_cursor(token: str) -> Tuple[str, str]:
+    """Inverse of encode_key_cursor, raises ValueError on malformed tokens"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(raw["k"]), str(raw["i"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(cursor: Optional[str]) -> dict:
+    """Mongo filter selecting documents strictly after ``cursor`` in (created_at desc, id desc) order"""
+    if not cursor:
+        return {}
+    created_at, id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": id}}
+    ]}
@@ -0,0 +1,193 @@
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs
+from metrics import rate_limit_rejections
+
+# Request bodies larger than this are passed through without looking for an email
+MAX_INSPECTED_BODY = 64 * 1024
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilled at ``rate`` tokens/second up to ``burst``.
+
+    Buckets live in an LRU map bounded by ``maxsize``; the least recently used
+    (i.e. idle) keys are evicted first, and an evicted key simply starts again
+    with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, maxsize: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.evictions = 0
+
+    def take(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Consume a token for ``key``. Returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate if self.rate > 0 else float("inf")
+
+    def stats(self) -> dict:
+        return {"rate": self.rate, "burst": self.burst, "size": len(self._buckets),
+                "maxsize": self.maxsize, "evictions": self.evictions}
+
+
+class RateLimiter:
+    """Token buckets per key type (ip, email) for a fixed set of write routes.
+
+    With ``shared`` set, keys that pass the local bucket are also counted in a
+    fixed window shared by every worker: ``shared(key, window) -> hits`` and
+    the limit per window is ``burst + rate * window``. Shared backend failures
+    fail open so an outage never blocks submissions.
+    """
+
+    def __init__(self, routes: Dict[Tuple[str, str], str], limits: Dict[str, TokenBucketLimiter],
+                 shared: Optional[Callable[[str, int], Awaitable[int]]] = None, shared_window: int = 60):
+        self.routes = routes
+        self.limits = limits
+        self.shared = shared
+        self.shared_window = shared_window
+        self.rejections: Dict[str, int] = {}
+
+    def route(self, method: str, path: str) -> Optional[str]:
+        return self.routes.get((method, path))
+
+    async def check(self, route: str, keys: Dict[str, str]) -> Optional[Tuple[str, float]]:
+        """Returns (key type, retry after seconds) for the first exhausted limit, or None if allowed"""
+        for key_type, value in keys.items():
+            limiter = self.limits.get(key_type)
+            if limiter is None or not value:
+                continue
+            key = f"{route}:{key_type}:{value}"
+            retry_after = limiter.take(key)
+            if not retry_after and self.shared:
+                try:
+                    hits = await self.shared(key, self.shared_window)
+                    if hits > limiter.burst + limiter.rate * self.shared_window:
+                        retry_after = self.shared_window - time.time() % self.shared_window
+                except Exception as e:
+                    logging.error("Shared rate limit check failed: %s", e)
+            if retry_after:
+                self._reject(route, key_type)
+                return key_type, retry_after
+        return None
+
+    def _reject(self, route: str, key_type: str):
+        label = f"{route}:{key_type}"
+        self.rejections[label] = self.rejections.get(label, 0) + 1
+        rate_limit_rejections.inc(route, key_type)
+
+    def stats(self) -> dict:
+        return {
+            "shared": self.shared is not None,
+            "rejections": dict(self.rejections),
+            "buckets": {key_type: limiter.stats() for key_type, limiter in self.limits.items()},
+        }
+
+
+def _client_ip(scope, trusted_proxies: int) -> Optional[str]:
+    """The address the outermost of ``trusted_proxies`` reverse proxies saw the request come from.
+
+    Each proxy appends its peer to X-Forwarded-For, so only the right-most
+    ``trusted_proxies`` entries are trustworthy; anything left of them is
+    client-supplied. Requests that did not pass through all of them fall back
+    to the socket peer.
+    """
+    if trusted_proxies > 0:
+        forwarded = []
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                forwarded.extend(entry.strip() for entry in value.decode("latin-1").split(","))
+        forwarded = [entry for entry in forwarded if entry]
+        if len(forwarded) >= trusted_proxies:
+            return forwarded[-trusted_proxies]
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _email_from_body(body: bytes) -> Optional[str]:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    email = payload.get("email") if isinstance(payload, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying a RateLimiter before routing, validation or any DB work.
+
+    The email key comes from the ``email`` query parameter or, for JSON
+    requests, the body's ``email`` field; the buffered body is replayed to the app.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, trusted_proxies: int = 0):
+        self.app = app
+        self.limiter = limiter
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope, receive, send):
+        route = self.limiter.route(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        keys = {"ip": _client_ip(scope, self.trusted_proxies)}
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("email"):
+            keys["email"] = query["email"][0].strip().lower()
+
+        messages = []
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        if "email" not in keys and content_type.startswith(b"application/json"):
+            body = b""
+            while True:
+                message = await receive()
+                messages.append(message)
+                if message["type"] != "http.request":
+                    break
+                body += message.get("body", b"")
+                if not message.get("more_body") or len(body) > MAX_INSPECTED_BODY:
+                    break
+            if len(body) <= MAX_INSPECTED_BODY:
+                keys["email"] = _email_from_body(body)
+
+        rejected = await self.limiter.check(route, keys)
+        if rejected:
+            key_type, retry_after = rejected
+            body = json.dumps({"detail": "Too many requests, please try again later"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        await self.app(scope, replay, send)
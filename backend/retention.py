@@ -0,0 +1,76 @@
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import bson
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; archives fall back to zlib
+    zstandard = None
+
+# Fields kept uncompressed on archived submissions, so counters and rollups can be
+# rebuilt and archived requests found by reference without decompressing
+ARCHIVE_FIELDS = ("id", "reference", "status", "service_type", "urgency", "created_at", "updated_at")
+
+ARCHIVE_CODECS = {"zlib": (lambda data: zlib.compress(data, 9), zlib.decompress)}
+if zstandard is not None:
+    ARCHIVE_CODECS["zstd"] = (
+        lambda data: zstandard.ZstdCompressor(level=10).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+ARCHIVE_CODEC = "zstd" if zstandard is not None else "zlib"
+
+
+def archive_record(document: dict, archived_at: datetime) -> dict:
+    """Compressed archive copy of a submission: BSON (so datetimes survive) squeezed by ARCHIVE_CODEC"""
+    raw = bson.encode({key: value for key, value in document.items() if key != "_id"})
+    compress, _ = ARCHIVE_CODECS[ARCHIVE_CODEC]
+    data = compress(raw)
+    record = {field: document.get(field) for field in ARCHIVE_FIELDS}
+    record.update(codec=ARCHIVE_CODEC, data=data, raw_size=len(raw), size=len(data), archived_at=archived_at)
+    return record
+
+
+def restore_record(record: dict) -> dict:
+    """The original submission from an archive record"""
+    _, decompress = ARCHIVE_CODECS[record["codec"]]
+    return bson.decode(bytes(decompress(bytes(record["data"]))))
+
+
+class RetentionPolicy:
+    """When submissions move to the archive and inactive subscriptions expire.
+
+    Submissions in a final status are archived ``completed_days`` after their
+    last update, and every submission ``max_age_days`` after it was made.
+    Inactive subscriptions expire ``subscription_ttl_days`` after they were
+    deactivated. A value of 0 disables that rule.
+    """
+
+    def __init__(self, final_statuses, completed_days: int = 90, max_age_days: int = 730,
+                 subscription_ttl_days: int = 180, batch_size: int = 500):
+        self.final_statuses = list(final_statuses)
+        self.completed_days = completed_days
+        self.max_age_days = max_age_days
+        self.subscription_ttl_days = subscription_ttl_days
+        self.batch_size = batch_size
+
+    def cutoffs(self, now: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """(final status updated before, created before); None where the rule is disabled"""
+        return (
+            now - timedelta(days=self.completed_days) if self.completed_days else None,
+            now - timedelta(days=self.max_age_days) if self.max_age_days else None,
+        )
+
+    @property
+    def subscription_ttl(self) -> Optional[timedelta]:
+        return timedelta(days=self.subscription_ttl_days) if self.subscription_ttl_days else None
+
+    def describe(self) -> dict:
+        return {
+            "final_statuses": self.final_statuses,
+            "completed_days": self.completed_days,
+            "max_age_days": self.max_age_days,
+            "subscription_ttl_days": self.subscription_ttl_days,
+            "batch_size": self.batch_size,
+            "codec": ARCHIVE_CODEC,
+        }
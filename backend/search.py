@@ -0,0 +1,45 @@
+import re
+from typing import Dict
+
+# Admin search modes for /api/contact/search
+SEARCH_MODES = ("reference", "name", "email", "phone", "text")
+
+_NON_DIGITS = re.compile(r"\D")
+_WORDS = re.compile(r"\w+")
+
+
+def normalize_name(value: str) -> str:
+    return " ".join(value.split()).lower()
+
+
+def normalize_phone(value: str) -> str:
+    return _NON_DIGITS.sub("", value)
+
+
+def text_terms(value: str) -> set:
+    """Lowercased words, as used by the in-memory full-text index"""
+    return set(_WORDS.findall(value.lower()))
+
+
+def submission_search_fields(record: dict) -> Dict[str, str]:
+    """Normalized copies of the searchable fields, stored alongside each submission"""
+    return {
+        "name_lc": normalize_name(record.get("name") or ""),
+        "email_lc": (record.get("email") or "").strip().lower(),
+        "phone_digits": normalize_phone(record.get("phone") or ""),
+    }
+
+
+def search_value(mode: str, query: str) -> str:
+    """Normalize a query the way the searched field is stored; raises ValueError if nothing is left"""
+    if mode == "name":
+        value = normalize_name(query)
+    elif mode == "email":
+        value = query.strip().lower()
+    elif mode == "phone":
+        value = normalize_phone(query)
+    else:
+        value = query.strip()
+    if not value:
+        raise ValueError(f"Empty {mode} query")
+    return value
@@ -0,0 +1,45 @@
+from typing import List, Type
+from pydantic import BaseModel, TypeAdapter
+from models import *
+
+
+def model_projection(model: Type[BaseModel]) -> dict:
+    """Mongo projection returning exactly the fields of ``model``"""
+    projection = {name: 1 for name in model.model_fields}
+    projection["_id"] = 0
+    return projection
+
+
+class ListEncoder:
+    """Validates a list of raw documents in one compiled pass and encodes it straight to JSON bytes.
+
+    Replaces building a model per document and letting FastAPI re-validate and
+    re-encode the list through ``response_model``.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.adapter = TypeAdapter(List[model])
+        self.projection = model_projection(model)
+
+    def validate(self, documents: List[dict]) -> List[BaseModel]:
+        return self.adapter.validate_python(documents)
+
+    def encode(self, documents: List[dict]) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(documents))
+
+
+class StoredContactSubmission(ContactSubmission):
+    """Read-side view of a stored submission. The address was validated on write,
+    and re-running EmailStr validation dominates the cost of listing submissions"""
+    email: str
+
+class StoredContactSubmissionPage(BaseModel):
+    items: List[StoredContactSubmission]
+    next_cursor: Optional[str] = None
+
+
+service_encoder = ListEncoder(ServiceResponse)
+additional_service_encoder = ListEncoder(AdditionalService)
+testimonial_encoder = ListEncoder(Testimonial)
+contact_submission_page_adapter = TypeAdapter(StoredContactSubmissionPage)
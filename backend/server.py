@@ -1,17 +1,37 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Request, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
 import logging
+import time
+import asyncio
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+# Load .env before importing the project modules, which read their settings
+# (storage backend, queues, caches, SMTP...) at import time
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
 from models import *
 from database import *
-from datetime import datetime
+from http_cache import cacheable_response
+from serializers import *
+from metrics import MetricsMiddleware, registry as metrics_registry, sample
+from pagination import decode_cursor
+from log_config import RequestIdMiddleware, configure_logging
+from idempotency import IdempotencyError, request_fingerprint, run_idempotent
+from rate_limit import RateLimiter, RateLimitMiddleware, TokenBucketLimiter
+from exporters import EXPORTERS, EXPORT_MEDIA_TYPES, SUBMISSION_EXPORT_FIELDS, SUBSCRIPTION_EXPORT_FIELDS, parquet_available
+from pydantic import TypeAdapter
+from datetime import datetime, timedelta
 
+# Log records are queued and written by a background thread, as JSON lines
+# tagged with the request's correlation ID (LOG_FORMAT=text for local reading)
+configure_logging(os.environ.get('LOG_LEVEL', 'INFO'), os.environ.get('LOG_FORMAT', 'json'))
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+email_adapter = TypeAdapter(SubscriptionEmail)
 
 # Create the main app without a prefix
 app = FastAPI(title="i-Notarize-Online API", version="1.0.0")
@@ -25,15 +45,38 @@ api_router = APIRouter(prefix="/api")
 async def root():
     return {"message": "i-Notarize-Online API is running", "version": "1.0.0"}
 
+@api_router.get("/ready")
+async def readiness_probe():
+    """Readiness probe: storage round trip latency and connection pool saturation"""
+    start = time.perf_counter()
+    try:
+        details = await storage.ready()
+    except Exception as e:
+        logging.error("Readiness check failed: %s", e)
+        return JSONResponse(status_code=503, content={
+            "status": "unavailable", "storage": storage.name, "error": str(e) or type(e).__name__
+        })
+    return {
+        "status": "ready",
+        "storage": storage.name,
+        "check_ms": round((time.perf_counter() - start) * 1000, 2),
+        **details
+    }
+
 # Contact submission endpoints
-@api_router.post("/contact/submit", response_model=ContactSubmissionResponse)
-async def submit_contact_form(submission: ContactSubmissionCreate):
+async def _submit_contact(submission: ContactSubmissionCreate) -> ContactSubmissionResponse:
     try:
         # Create contact submission record
         contact_record = ContactSubmission(**submission.dict())
         
-        # Insert into database
-        await contact_submissions.insert_one(contact_record.dict())
+        # Insert into database (or hand off to the write-behind queue) and count it
+        record = await save_contact_submission(contact_record.dict())
+        
+        # Notification delivery happens in the background job runner
+        try:
+            await enqueue_submission_notifications(record)
+        except Exception as e:
+            logging.error("Failed to queue notifications for %s: %s", record['reference'], e)
         
         # Calculate estimated response time based on urgency
         estimated_response = "within 1 hour" if submission.urgency == "rush" else "within 2 hours"
@@ -41,24 +84,201 @@ async def submit_contact_form(submission: ContactSubmissionCreate):
         return ContactSubmissionResponse(
             success=True,
             message="Thank you for your request! We will contact you soon to confirm your appointment.",
-            reference=contact_record.reference,
+            reference=record["reference"],
             estimated_response=estimated_response
         )
         
     except Exception as e:
-        logging.error(f"Error submitting contact form: {str(e)}")
+        logging.error("Error submitting contact form: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to submit contact form")
+
+@api_router.post("/contact/submit", response_model=ContactSubmissionResponse)
+async def submit_contact_form(submission: ContactSubmissionCreate, response: Response,
+                              idempotency_key: Optional[str] = Header(None)):
+    """Submit the contact form. Retries sharing an Idempotency-Key get the original response"""
+    if idempotency_key is None:
+        return await _submit_contact(submission)
+
+    async def handler():
+        return (await _submit_contact(submission)).model_dump()
+
+    try:
+        result, replayed = await run_idempotent(
+            storage.idempotency_keys,
+            f"contact_submit:{idempotency_key}",
+            request_fingerprint(submission.model_dump(mode="json")),
+            handler,
+            ttl=IDEMPOTENCY_TTL,
+            wait=IDEMPOTENCY_WAIT
+        )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error("Error checking idempotency key: %s", e)
         raise HTTPException(status_code=500, detail="Failed to submit contact form")
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
-@api_router.get("/contact/submissions", response_model=List[ContactSubmission])
-async def get_contact_submissions():
-    """Admin endpoint to get all contact submissions"""
+@api_router.get("/contact/submissions", response_model=ContactSubmissionPage)
+async def get_contact_submissions(
+    limit: int = Query(SUBMISSIONS_PAGE_SIZE, ge=1, le=SUBMISSIONS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = Query(None, pattern="^(remote|mobile|bulk)$"),
+    urgency: Optional[str] = Query(None, pattern="^(normal|rush)$")
+):
+    """Admin endpoint to page through contact submissions, newest first"""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
-        submissions = await contact_submissions.find().sort("created_at", -1).to_list(100)
-        return [ContactSubmission(**submission) for submission in submissions]
+        submissions, next_cursor = await list_contact_submissions(
+            limit, cursor, status=status, service_type=service_type, urgency=urgency
+        )
+        page = contact_submission_page_adapter.validate_python(
+            {"items": submissions, "next_cursor": next_cursor}
+        )
+        return Response(content=contact_submission_page_adapter.dump_json(page), media_type="application/json")
     except Exception as e:
-        logging.error(f"Error retrieving submissions: {str(e)}")
+        logging.error("Error retrieving submissions: %s", e)
         raise HTTPException(status_code=500, detail="Failed to retrieve submissions")
 
+@api_router.patch("/contact/submissions/status", response_model=BulkStatusUpdateResponse)
+async def bulk_update_submission_status(request: BulkStatusUpdateRequest):
+    """Admin endpoint: apply many status changes in one write, with a result per submission"""
+    ids = [change.id for change in request.updates]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Each submission may appear only once")
+    try:
+        results = await update_submission_statuses([change.model_dump() for change in request.updates])
+    except Exception as e:
+        logging.error("Error updating submission statuses: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to update submission statuses")
+    counts = {}
+    for result in results:
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    return {"counts": counts, "results": results}
+
+STATUS_UPDATE_ERRORS = {
+    "not_found": (404, "Submission not found"),
+    "conflict": (409, "Submission was modified by someone else, reload and retry"),
+    "invalid_transition": (422, "Status change not allowed"),
+}
+
+@api_router.patch("/contact/submissions/{submission_id}/status", response_model=SubmissionStatusResult)
+async def update_submission_status(submission_id: str, update: SubmissionStatusUpdate):
+    """Admin endpoint: move one submission through the status workflow"""
+    try:
+        result, = await update_submission_statuses([{"id": submission_id, **update.model_dump()}])
+    except Exception as e:
+        logging.error("Error updating submission status: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to update submission status")
+    if result["outcome"] in STATUS_UPDATE_ERRORS:
+        status_code, detail = STATUS_UPDATE_ERRORS[result["outcome"]]
+        raise HTTPException(status_code=status_code, detail=detail)
+    return result
+
+@api_router.get("/contact/archive/{reference}", response_model=ContactSubmission)
+async def get_archived_contact_submission(reference: str):
+    """Admin endpoint: a submission that retention moved to the archive"""
+    try:
+        submission = await get_archived_submission(reference)
+    except Exception as e:
+        logging.error("Error retrieving archived submission: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to retrieve archived submission")
+    if submission is None:
+        raise HTTPException(status_code=404, detail="Archived submission not found")
+    return submission
+
+@api_router.get("/retention/report")
+async def get_retention_report():
+    """Admin endpoint: dry run of the retention policy (apply it with `manage.py retention`)"""
+    try:
+        return await retention_report()
+    except Exception as e:
+        logging.error("Error building retention report: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to build retention report")
+
+@api_router.get("/contact/search", response_model=ContactSubmissionPage)
+async def search_contact_submissions_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    by: str = Query(..., pattern="^(reference|name|email|phone|text)$"),
+    limit: int = Query(SUBMISSIONS_PAGE_SIZE, ge=1, le=SUBMISSIONS_PAGE_MAX),
+    cursor: Optional[str] = None
+):
+    """Admin search: exact reference, name/email/phone prefix (A-Z pages) or message/document text (newest first)"""
+    try:
+        submissions, next_cursor = await search_contact_submissions(by, q, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error("Error searching submissions: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to search submissions")
+    page = contact_submission_page_adapter.validate_python({"items": submissions, "next_cursor": next_cursor})
+    return Response(content=contact_submission_page_adapter.dump_json(page), media_type="application/json")
+
+# Export endpoints
+def export_response(name: str, documents, fields: List[str], format: str):
+    """Stream an export straight from a database cursor"""
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{format}"
+    return StreamingResponse(
+        EXPORTERS[format](documents, fields),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.get("/contact/submissions/export")
+async def export_contact_submissions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Admin endpoint to export submissions created in [start, end)"""
+    return export_response(
+        "contact_submissions", iter_contact_submissions(start, end), SUBMISSION_EXPORT_FIELDS, format
+    )
+
+@api_router.get("/email/subscriptions/export")
+async def export_email_subscriptions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Admin endpoint to export subscriptions made in [start, end)"""
+    return export_response(
+        "email_subscriptions", iter_email_subscriptions(start, end), SUBSCRIPTION_EXPORT_FIELDS, format
+    )
+
+# Analytics endpoints
+@api_router.get("/analytics/submissions", response_model=SubmissionAnalytics)
+async def get_submissions_analytics(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Admin endpoint: submission volume per UTC hour or day in [start, end), from the rollups.
+
+    Defaults to the last 30 days (daily) or 48 hours (hourly).
+    """
+    end = utc_naive(end) if end else datetime.utcnow()
+    start = utc_naive(start) if start else end - (timedelta(days=30) if granularity == "day" else timedelta(hours=48))
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start) / ROLLUP_GRANULARITIES[granularity] > ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Range too wide: at most {ANALYTICS_MAX_BUCKETS} {granularity}s")
+    try:
+        return await get_submission_analytics(granularity, start, end)
+    except Exception as e:
+        logging.error("Error retrieving submission analytics: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to retrieve submission analytics")
+
 # Business data endpoints
 @api_router.put("/business/info")
 async def update_business_info(info_data: dict):
@@ -67,87 +287,122 @@ async def update_business_info(info_data: dict):
         await update_business_config("business_info", info_data)
         return {"success": True, "message": "Business info updated successfully"}
     except Exception as e:
-        logging.error(f"Error updating business info: {str(e)}")
+        logging.error("Error updating business info: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update business info")
 
 @api_router.get("/business/info")
-async def get_business_info():
+async def get_business_info(request: Request):
     try:
-        info = await get_business_config("business_info")
-        if not info:
+        snapshot = await snapshots.get("business_info")
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Business info not found")
-        return info
+        return snapshot.response(request)
     except Exception as e:
-        logging.error(f"Error getting business info: {str(e)}")
+        logging.error("Error getting business info: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get business info")
 
 @api_router.get("/business/hours")
-async def get_business_hours():
+async def get_business_hours(request: Request):
     try:
-        hours = await get_business_config("business_hours")
-        if not hours:
+        snapshot = await snapshots.get("business_hours")
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Business hours not found")
-        return hours
+        return snapshot.response(request)
     except Exception as e:
-        logging.error(f"Error getting business hours: {str(e)}")
+        logging.error("Error getting business hours: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get business hours")
 
 @api_router.get("/business/stats")
-async def get_business_stats():
+async def get_business_stats_endpoint(request: Request):
     try:
-        stats = await get_business_config("business_stats")
-        if not stats:
+        snapshot = await snapshots.get("business_stats")
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Business stats not found")
-        return stats
+        return snapshot.response(request)
     except Exception as e:
-        logging.error(f"Error getting business stats: {str(e)}")
+        logging.error("Error getting business stats: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get business stats")
 
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Admin endpoint to inspect cache, snapshot and rate limiter counters"""
+    stats = {
+        "business_config": config_cache.stats(),
+        "snapshots": snapshots.stats(),
+        "config_version": config_watcher.stats(),
+        "rate_limit": rate_limiter.stats()
+    }
+    if contact_write_queue:
+        stats["contact_write_queue"] = contact_write_queue.stats()
+    return stats
+
+@api_router.get("/jobs/stats")
+async def get_job_stats():
+    """Admin endpoint to inspect the background job outbox"""
+    try:
+        return await job_runner.stats()
+    except Exception as e:
+        logging.error("Error getting job stats: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to get job stats")
+
+@api_router.post("/jobs/{job_id}/retry")
+async def retry_dead_job(job_id: str):
+    """Admin endpoint to give a dead-lettered job another set of attempts"""
+    try:
+        requeued = await storage.jobs.requeue_dead(job_id)
+    except Exception as e:
+        logging.error("Error requeueing job: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to requeue job")
+    if not requeued:
+        raise HTTPException(status_code=404, detail="Dead-lettered job not found")
+    return {"success": True, "message": "Job requeued"}
+
+@api_router.get("/db/indexes")
+async def get_index_report():
+    """Admin endpoint to report drift between the index registry and the database"""
+    try:
+        return await ensure_indexes(create=False)
+    except Exception as e:
+        logging.error("Error checking indexes: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to check indexes")
+
 # Services endpoints
 @api_router.get("/services", response_model=List[ServiceResponse])
-async def get_services():
+async def get_services(request: Request):
     try:
-        service_list = await services.find({"active": True}).to_list(100)
-        return [ServiceResponse(**service) for service in service_list]
+        return (await snapshots.get("services")).response(request)
     except Exception as e:
-        logging.error(f"Error getting services: {str(e)}")
+        logging.error("Error getting services: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get services")
 
 @api_router.get("/pricing/additional", response_model=List[AdditionalService])
-async def get_additional_pricing():
+async def get_additional_pricing(request: Request):
     try:
-        additional_list = await additional_services.find({"active": True}).to_list(100)
-        return [AdditionalService(**service) for service in additional_list]
+        return (await snapshots.get("additional_pricing")).response(request)
     except Exception as e:
-        logging.error(f"Error getting additional services: {str(e)}")
+        logging.error("Error getting additional services: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get additional services")
 
 # Coverage endpoints
 @api_router.get("/coverage")
-async def get_coverage_areas():
+async def get_coverage_areas(request: Request):
     try:
-        coverage = await get_business_config("coverage_areas")
-        if not coverage:
+        snapshot = await snapshots.get("coverage")
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Coverage areas not found")
-        return coverage
+        return snapshot.response(request)
     except Exception as e:
-        logging.error(f"Error getting coverage areas: {str(e)}")
+        logging.error("Error getting coverage areas: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get coverage areas")
 
 # Testimonials endpoints
 @api_router.post("/email/subscribe")
-async def subscribe_email(email: EmailStr, source: str = "website"):
+async def subscribe_email(email: SubscriptionEmail, source: str = "website"):
     """Subscribe email for updates"""
     try:
-        # Check if email already exists
-        existing = await email_subscriptions.find_one({"email": email, "active": True})
-        if existing:
+        if not await subscribe_email_address(email, source):
             return {"success": True, "message": "Email already subscribed", "already_subscribed": True}
         
-        # Create new subscription
-        subscription = EmailSubscription(email=email, source=source)
-        await email_subscriptions.insert_one(subscription.dict())
-        
         return {
             "success": True, 
             "message": "Successfully subscribed to updates!",
@@ -155,23 +410,163 @@ async def subscribe_email(email: EmailStr, source: str = "website"):
         }
         
     except Exception as e:
-        logging.error(f"Error subscribing email: {str(e)}")
+        logging.error("Error subscribing email: %s", e)
         raise HTTPException(status_code=500, detail="Failed to subscribe email")
 
+@api_router.post("/email/unsubscribe")
+async def unsubscribe_email(email: SubscriptionEmail):
+    """Stop sending updates to an address; the subscription is deleted after the retention TTL"""
+    try:
+        unsubscribed = await unsubscribe_email_address(email)
+    except Exception as e:
+        logging.error("Error unsubscribing email: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to unsubscribe email")
+    return {"success": True, "unsubscribed": unsubscribed}
+
+@api_router.post("/email/subscribe/bulk", response_model=BulkSubscribeResponse)
+async def bulk_subscribe_emails(request: BulkSubscribeRequest):
+    """Admin endpoint to import a list of addresses, reporting an outcome per address"""
+    results = []
+    valid_emails = []
+    seen = set()
+    for raw_email in request.emails:
+        try:
+            email = email_adapter.validate_python(raw_email)
+        except ValueError:
+            results.append({"email": raw_email, "outcome": "invalid"})
+            continue
+        if email in seen:
+            results.append({"email": email, "outcome": "duplicate"})
+            continue
+        seen.add(email)
+        valid_emails.append(email)
+        results.append({"email": email, "outcome": None})
+    
+    try:
+        outcomes = iter(await bulk_subscribe_email_addresses(valid_emails, request.source))
+    except Exception as e:
+        logging.error("Error bulk subscribing emails: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to subscribe emails")
+    
+    counts = {}
+    for result in results:
+        if result["outcome"] is None:
+            result["outcome"] = next(outcomes)
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    return {"success": "error" not in counts, "counts": counts, "results": results}
+
+@api_router.post("/testimonials", response_model=Testimonial)
+async def create_testimonial_entry(testimonial: TestimonialCreate):
+    """Submit a testimonial. It is published once verified"""
+    try:
+        return await create_testimonial(Testimonial(**testimonial.dict()))
+    except Exception as e:
+        logging.error("Error creating testimonial: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to create testimonial")
+
+@api_router.post("/testimonials/{testimonial_id}/verify", response_model=Testimonial)
+async def verify_testimonial_entry(testimonial_id: str):
+    """Admin endpoint to publish a pending testimonial"""
+    try:
+        testimonial = await verify_testimonial(testimonial_id)
+    except Exception as e:
+        logging.error("Error verifying testimonial: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to verify testimonial")
+    if testimonial is None:
+        raise HTTPException(status_code=404, detail="Pending testimonial not found")
+    return testimonial
+
 @api_router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials(limit: int = 10):
+async def get_testimonials(request: Request, limit: int = 10):
     try:
-        testimonial_list = await testimonials.find(
-            {"active": True, "verified": True}
-        ).sort("created_at", -1).limit(limit).to_list(limit)
-        return [Testimonial(**testimonial) for testimonial in testimonial_list]
+        testimonial_list = await get_active_testimonials(limit)
+        return cacheable_response(request, testimonial_encoder.encode(testimonial_list))
     except Exception as e:
-        logging.error(f"Error getting testimonials: {str(e)}")
+        logging.error("Error getting testimonials: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get testimonials")
 
+# Landing page bootstrap endpoint
+async def _landing_services(limit: int):
+    return service_encoder.validate(await get_active_services())
+
+async def _landing_additional_pricing(limit: int):
+    return additional_service_encoder.validate(await get_active_additional_services())
+
+async def _landing_testimonials(limit: int):
+    return testimonial_encoder.validate(await get_active_testimonials(limit))
+
+LANDING_SECTIONS = {
+    "business_info": lambda limit: get_business_config("business_info"),
+    "business_hours": lambda limit: get_business_config("business_hours"),
+    "business_stats": lambda limit: get_business_stats(),
+    "services": _landing_services,
+    "additional_pricing": _landing_additional_pricing,
+    "coverage": lambda limit: get_business_config("coverage_areas"),
+    "testimonials": _landing_testimonials,
+}
+
+@api_router.get("/landing", response_model=LandingResponse)
+async def get_landing(request: Request, testimonials_limit: int = 10):
+    """Everything the landing page needs in one round trip, sections are loaded concurrently"""
+    names = list(LANDING_SECTIONS)
+    results = await asyncio.gather(
+        *(LANDING_SECTIONS[name](testimonials_limit) for name in names),
+        return_exceptions=True
+    )
+    
+    landing = {"errors": {}}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logging.error("Error loading landing section %s: %s", name, result)
+            landing["errors"][name] = "Failed to load"
+        elif result is None:
+            landing["errors"][name] = "Not found"
+        else:
+            landing[name] = result
+    
+    # Only fully loaded pages are safe to hand to shared caches
+    if landing["errors"]:
+        return landing
+    return cacheable_response(request, landing)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+def _env_flag(name: str, default: str = 'false') -> bool:
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes')
+
+# Write endpoints are rate limited per client IP and per email before any
+# validation or DB work; RATE_LIMIT_SHARED adds a cross-worker window in storage
+rate_limit_keys = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '10000'))
+rate_limiter = RateLimiter(
+    routes={("POST", "/api/contact/submit"): "contact_submit", ("POST", "/api/email/subscribe"): "email_subscribe"},
+    limits={
+        "ip": TokenBucketLimiter(
+            rate=float(os.environ.get('RATE_LIMIT_IP_PER_MINUTE', '20')) / 60,
+            burst=float(os.environ.get('RATE_LIMIT_IP_BURST', '20')),
+            maxsize=rate_limit_keys
+        ),
+        "email": TokenBucketLimiter(
+            rate=float(os.environ.get('RATE_LIMIT_EMAIL_PER_MINUTE', '5')) / 60,
+            burst=float(os.environ.get('RATE_LIMIT_EMAIL_BURST', '5')),
+            maxsize=rate_limit_keys
+        ),
+    },
+    shared=(lambda key, window: storage.rate_limits.hit(key, window)) if _env_flag('RATE_LIMIT_SHARED') else None,
+    shared_window=int(os.environ.get('RATE_LIMIT_SHARED_WINDOW', '60'))
+)
+# Number of reverse proxies (ingress, load balancer) in front of the app that
+# append to X-Forwarded-For; the client IP is taken that many entries from the
+# right. Set it to the real number of hops in the deployment: the default 0
+# ignores the header (clients connect directly), and any value above the real
+# count lets clients pick their own key by sending X-Forwarded-For
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '0'))
+if _env_flag('RATE_LIMIT_ENABLED', 'true'):
+    # Added before CORS so rejections still carry CORS headers
+    app.add_middleware(
+        RateLimitMiddleware, limiter=rate_limiter, trusted_proxies=RATE_LIMIT_TRUSTED_PROXIES
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -179,23 +574,70 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+@metrics_registry.collector
+def collect_cache_metrics():
+    stats = config_cache.stats()
+    lines = (
+        sample("business_config_cache_hits_total", "Business config cache hits", "counter", stats["hits"])
+        + sample("business_config_cache_misses_total", "Business config cache misses", "counter", stats["misses"])
+        + sample("business_config_cache_size", "Business config cache entries", "gauge", stats["size"])
+    )
+    if contact_write_queue:
+        queue_stats = contact_write_queue.stats()
+        lines += (
+            sample("contact_write_queue_depth", "Submissions waiting to be flushed", "gauge", queue_stats["queued"])
+            + sample("contact_write_queue_flush_failures_total", "Failed write-behind flushes", "counter",
+                     queue_stats["flush_failures"])
+        )
+    return lines
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     try:
+        await storage.connect()
         await init_database()
         logger.info("Database initialized successfully")
+        await ensure_indexes()
+        logger.info("Database indexes ensured")
+        await snapshots.rebuild()
+        logger.info("Response snapshots built")
+    except IndexSetupError as e:
+        # Serving without these would silently drop the uniqueness guarantees
+        logger.critical("%s", e)
+        raise
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
+
+    # Started whatever happened above: the watcher refreshes caches and snapshots
+    # once storage answers, requests still enqueue outbox jobs, and the claim
+    # loop retries until storage is reachable
+    await config_watcher.start()
+    logger.info("Config version watcher started")
+    job_runner.start()
+    logger.info("Background job runner started")
+    
+    if contact_write_queue:
+        await contact_write_queue.start()
+        logger.info("Contact submission write-behind queue started")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await config_watcher.stop()
+    await job_runner.stop()
+    if contact_write_queue:
+        try:
+            await contact_write_queue.stop()
+        except Exception as e:
+            logger.error("Failed to drain contact submission queue: %s", e)
+    await storage.close()
@@ -0,0 +1,127 @@
+import gzip
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+from fastapi import Request, Response
+from http_cache import CACHE_CONTROL, compute_etag, etag_matches
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip and identity are always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+ENCODERS = {"gzip": lambda body: gzip.compress(body, compresslevel=9, mtime=0)}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=11)
+
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> str:
+    """Pick the best available content coding for an Accept-Encoding header"""
+    if not accept_encoding:
+        return "identity"
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    wildcard = weights.get("*")
+    candidates = []
+    for rank, coding in enumerate(reversed(ENCODING_PREFERENCE)):
+        if coding == "identity":
+            weight = weights.get(coding, 1.0 if wildcard is None else wildcard)
+        elif coding in available:
+            weight = weights.get(coding, wildcard or 0.0)
+        else:
+            continue
+        if weight > 0:
+            candidates.append((weight, rank, coding))
+    return max(candidates)[2] if candidates else "identity"
+
+
+class Snapshot:
+    """A response body pre-rendered once, with compressed variants and per-variant ETags"""
+
+    def __init__(self, body: bytes):
+        etag = compute_etag(body)
+        self.variants = {"identity": (body, etag)}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            for coding, encode in ENCODERS.items():
+                compressed = encode(body)
+                if len(compressed) < len(body):
+                    # Each representation needs its own strong validator
+                    self.variants[coding] = (compressed, f'{etag[:-1]}-{coding}"')
+        self.etags = {variant_etag for _, variant_etag in self.variants.values()}
+
+    def response(self, request: Request, cache_control: str = CACHE_CONTROL) -> Response:
+        coding = negotiate_encoding(request.headers.get("accept-encoding"), self.variants)
+        body, etag = self.variants[coding]
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if any(etag_matches(request, candidate) for candidate in self.etags):
+            return Response(status_code=304, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+class SnapshotStore:
+    """Named snapshots rebuilt from async loaders that return JSON bytes (or None when there is no data).
+
+    Snapshots named in ``ttls`` are also rebuilt on demand once older than their TTL in seconds.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Awaitable[Optional[bytes]]]], ttls: Optional[Dict[str, float]] = None):
+        self.loaders = loaders
+        self.ttls = ttls or {}
+        self._snapshots: Dict[str, Optional[Snapshot]] = {}
+        self._built_at: Dict[str, float] = {}
+        self.rebuilds = 0
+
+    def _store(self, name: str, body: Optional[bytes]):
+        self._snapshots[name] = Snapshot(body) if body is not None else None
+        self._built_at[name] = time.monotonic()
+        self.rebuilds += 1
+
+    async def rebuild(self, names: Optional[Iterable[str]] = None):
+        """Re-render the given snapshots (all by default). A failed load leaves the snapshot to be built on demand"""
+        names = list(self.loaders if names is None else names)
+        results = await asyncio.gather(*(self.loaders[name]() for name in names), return_exceptions=True)
+        for name, body in zip(names, results):
+            if isinstance(body, Exception):
+                logging.error("Failed to build %s snapshot: %s", name, body)
+                self._snapshots.pop(name, None)
+            else:
+                self._store(name, body)
+
+    def invalidate(self, names: Optional[Iterable[str]] = None):
+        for name in list(self.loaders if names is None else names):
+            self._snapshots.pop(name, None)
+
+    async def get(self, name: str) -> Optional[Snapshot]:
+        """The current snapshot, building it first if it is missing or expired"""
+        ttl = self.ttls.get(name)
+        if name not in self._snapshots or (ttl is not None and time.monotonic() - self._built_at[name] >= ttl):
+            self._store(name, await self.loaders[name]())
+        return self._snapshots[name]
+
+    def stats(self) -> dict:
+        return {
+            "rebuilds": self.rebuilds,
+            "encodings": ["identity"] + list(ENCODERS),
+            "snapshots": {
+                name: {coding: len(body) for coding, (body, _) in snapshot.variants.items()} if snapshot else None
+                for name, snapshot in self._snapshots.items()
+            },
+        }
@@ -0,0 +1,348 @@
+import os
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+class IndexSetupError(RuntimeError):
+    """A unique index could not be built (usually duplicates in existing data); see manage.py dedupe"""
+
+    def __init__(self, message: str, report: dict):
+        super().__init__(message)
+        self.report = report
+
+
+# Outcomes reported per address by SubscriptionRepository.bulk_subscribe
+SUBSCRIBED = "subscribed"
+ALREADY_SUBSCRIBED = "already_subscribed"
+SUBSCRIBE_ERROR = "error"
+
+# business_configs key of the version stamp bumped on every config write
+CONFIG_VERSION_KEY = "__version__"
+
+# Normalized field each prefix search mode runs against
+SEARCH_FIELDS = {"name": "name_lc", "email": "email_lc", "phone": "phone_digits"}
+
+# Outbox job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_DEAD = "dead"
+
+# Idempotency record states
+IDEMPOTENCY_PENDING = "pending"
+IDEMPOTENCY_COMPLETED = "completed"
+
+
+class SubmissionRepository:
+    """Contact submissions"""
+
+    async def insert(self, record: dict) -> dict:
+        """Insert one submission, disambiguating the reference if it is already taken"""
+        raise NotImplementedError
+
+    async def insert_many(self, records: List[dict]):
+        """Idempotent batch insert: records whose id is already stored are skipped"""
+        raise NotImplementedError
+
+    async def list_page(self, limit: int, cursor: Optional[str] = None,
+                        **filters) -> Tuple[List[dict], Optional[str]]:
+        """Keyset page newest first, returns (documents, next_cursor)"""
+        raise NotImplementedError
+
+    def iter_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Stream submissions created in [start, end) oldest first"""
+        raise NotImplementedError
+
+    async def count_by(self, field: str) -> Dict[str, int]:
+        """Full scan: number of submissions per value of ``field``. For rebuilding counters only"""
+        raise NotImplementedError
+
+    async def dedupe_references(self) -> Dict[str, int]:
+        """Give every submission but the oldest a fresh suffixed reference where references collide"""
+        raise NotImplementedError
+
+    async def get_many(self, ids: List[str]) -> List[dict]:
+        """Submissions with the given ids; missing ids are skipped"""
+        raise NotImplementedError
+
+    async def transition_status(self, changes: List[Tuple[str, str, Optional[datetime], str]], now: datetime) -> List[str]:
+        """Apply (id, from status, expected updated_at or None, to status) changes in one write.
+
+        Each change only applies while the submission still has the from status
+        (and the expected updated_at); returns the ids that were updated.
+        """
+        raise NotImplementedError
+
+    def retention_candidates(self, statuses: List[str], completed_before: Optional[datetime],
+                             created_before: Optional[datetime], limit: int = 0,
+                             batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Stream full submissions due for archival: in one of ``statuses`` and last
+        updated before ``completed_before``, or created before ``created_before``"""
+        raise NotImplementedError
+
+    async def delete_unchanged(self, documents: List[dict]) -> List[str]:
+        """Delete submissions still at the given documents' updated_at; returns the ids deleted"""
+        raise NotImplementedError
+
+    async def set_fields(self, updates: List[Tuple[str, dict]]):
+        """Set fields on many submissions at once, given (id, fields) pairs"""
+        raise NotImplementedError
+
+    async def search(self, mode: str, value: str, limit: int, cursor: Optional[str] = None):
+        """Indexed search, returns (documents, next_cursor). ``value`` is already normalized.
+
+        reference: exact match. name/email/phone: prefix of the normalized field,
+        ordered by it. text: full-text over message and document_type, newest first.
+        """
+        raise NotImplementedError
+
+
+class ServiceRepository:
+    """Services and additional service pricing share this shape"""
+
+    async def insert(self, document: dict):
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def list_active(self) -> List[dict]:
+        raise NotImplementedError
+
+
+class TestimonialRepository:
+    async def insert(self, document: dict):
+        raise NotImplementedError
+
+    async def list_active(self, limit: int = 10) -> List[dict]:
+        """Most recent active, verified testimonials"""
+        raise NotImplementedError
+
+    async def verify(self, testimonial_id: str) -> Optional[dict]:
+        """Mark an unverified testimonial verified, returning it. None if missing or already verified"""
+        raise NotImplementedError
+
+    async def rating_summary(self) -> dict:
+        """Full scan of active testimonials: {"verified", "pending", "rating_sum"}. For rebuilding counters only"""
+        raise NotImplementedError
+
+
+class ConfigRepository:
+    """Business configuration documents keyed by name"""
+
+    async def insert(self, document: dict):
+        raise NotImplementedError
+
+    async def get(self, key: str) -> Optional[dict]:
+        """The config's data, or None"""
+        raise NotImplementedError
+
+    async def set(self, key: str, data: dict):
+        """Upsert the config's data"""
+        raise NotImplementedError
+
+    async def get_version(self) -> int:
+        """The config version stamp, 0 if never bumped"""
+        raise NotImplementedError
+
+    async def bump_version(self) -> int:
+        """Atomically increment the config version stamp and return the new value"""
+        raise NotImplementedError
+
+    def watch_version(self) -> AsyncIterator[int]:
+        """Yield the current version once watching has started, then every new one"""
+        raise NotImplementedError
+
+
+class SubscriptionRepository:
+    async def subscribe(self, document: dict) -> bool:
+        """Atomically add an active subscription. Returns False if the address already has one"""
+        raise NotImplementedError
+
+    async def bulk_subscribe(self, documents: List[dict]) -> List[str]:
+        """Subscribe many addresses in one write, returning an outcome per document"""
+        raise NotImplementedError
+
+    def iter_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Stream subscriptions made in [start, end) oldest first"""
+        raise NotImplementedError
+
+    async def dedupe_active(self) -> Dict[str, int]:
+        """Deactivate all but the oldest of several active subscriptions for one address"""
+        raise NotImplementedError
+
+    async def unsubscribe(self, email: str, expires_at: Optional[datetime]) -> bool:
+        """Deactivate the address's subscription, to be deleted at ``expires_at``. False if none was active"""
+        raise NotImplementedError
+
+    async def schedule_expiry(self, ttl: timedelta, dry_run: bool = False) -> int:
+        """Give inactive subscriptions without one an expires_at ``ttl`` after they were
+        deactivated (or made). Returns how many were (or would be) stamped"""
+        raise NotImplementedError
+
+    async def retention_counts(self) -> Dict[str, int]:
+        """Number of active, inactive and inactive-with-expiry subscriptions"""
+        raise NotImplementedError
+
+
+class SubmissionArchiveRepository:
+    """Archived submissions: compressed documents plus a few plain fields (see retention.ARCHIVE_FIELDS)"""
+
+    async def store(self, records: List[dict]):
+        """Insert or replace archive records by submission id"""
+        raise NotImplementedError
+
+    async def remove(self, ids: List[str]):
+        raise NotImplementedError
+
+    async def get_by_reference(self, reference: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def iter_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Stream the plain fields of submissions created in [start, end), oldest first"""
+        raise NotImplementedError
+
+    async def count_by(self, field: str) -> Dict[str, int]:
+        raise NotImplementedError
+
+    async def stats(self) -> Dict[str, int]:
+        """Record count, original and stored (compressed) bytes"""
+        raise NotImplementedError
+
+
+class RateLimitRepository:
+    """Fixed-window hit counters shared by every worker"""
+
+    async def hit(self, key: str, window: int) -> int:
+        """Count a hit for ``key`` in the current ``window``-second window and return the window's total"""
+        raise NotImplementedError
+
+
+class IdempotencyRepository:
+    """Idempotency-Key reservations and the responses they produced, expiring after a TTL"""
+
+    async def reserve(self, key: str, fingerprint: str, ttl: float) -> Optional[dict]:
+        """Atomically claim ``key`` as pending. Returns None if claimed, else the existing record"""
+        raise NotImplementedError
+
+    async def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def complete(self, key: str, response: dict):
+        """Store the response for a reserved key"""
+        raise NotImplementedError
+
+    async def release(self, key: str):
+        """Drop a pending reservation whose request failed"""
+        raise NotImplementedError
+
+
+class JobRepository:
+    """Outbox of background jobs. Claims are leases: a job whose worker died is claimable again once its lease expires"""
+
+    async def enqueue(self, jobs: List[dict]):
+        raise NotImplementedError
+
+    async def claim(self, lease: float) -> Optional[dict]:
+        """Atomically take the next due job, marking it running and counting the attempt"""
+        raise NotImplementedError
+
+    async def complete(self, job_id: str):
+        raise NotImplementedError
+
+    async def retry(self, job_id: str, run_at: datetime, error: str):
+        """Return a failed job to pending, due again at ``run_at``"""
+        raise NotImplementedError
+
+    async def dead_letter(self, job_id: str, error: str):
+        """Park a job that exhausted its attempts"""
+        raise NotImplementedError
+
+    async def requeue_dead(self, job_id: str) -> bool:
+        """Give a dead-lettered job a fresh set of attempts. Returns False if no such dead job"""
+        raise NotImplementedError
+
+    async def counts(self) -> dict:
+        """Number of jobs per status"""
+        raise NotImplementedError
+
+
+class CounterRepository:
+    """Named counter documents updated with atomic increments, read in O(1)"""
+
+    async def increment(self, name: str, amounts: Dict[str, int]):
+        """Atomically add ``amounts`` to the counter's fields; dotted names address nested fields"""
+        raise NotImplementedError
+
+    async def get(self, name: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def replace(self, name: str, values: dict):
+        """Overwrite the counter with freshly computed values"""
+        raise NotImplementedError
+
+
+class RollupRepository:
+    """Pre-aggregated submission counts per time bucket (UTC), keyed by granularity and bucket start"""
+
+    async def increment(self, buckets: List[Tuple[str, datetime]], amounts: Dict[str, int]):
+        """Atomically add ``amounts`` to each (granularity, bucket start) rollup, creating missing ones"""
+        raise NotImplementedError
+
+    async def increment_many(self, amounts: Dict[Tuple[str, datetime], Dict[str, int]]):
+        """Like increment, with separate amounts per (granularity, bucket start), in one write"""
+        raise NotImplementedError
+
+    async def list_range(self, granularity: str, start: datetime, end: datetime) -> List[dict]:
+        """Rollups with bucket start in [start, end), oldest first"""
+        raise NotImplementedError
+
+    async def replace_range(self, granularity: str, start: datetime, end: datetime, rollups: List[dict]):
+        """Swap every rollup in [start, end) for freshly computed ones"""
+        raise NotImplementedError
+
+
+class Storage:
+    """A storage backend: one repository per collection plus lifecycle hooks"""
+
+    name = "base"
+    submissions: SubmissionRepository
+    services: ServiceRepository
+    additional_services: ServiceRepository
+    testimonials: TestimonialRepository
+    configs: ConfigRepository
+    subscriptions: SubscriptionRepository
+    rate_limits: RateLimitRepository
+    idempotency_keys: IdempotencyRepository
+    jobs: JobRepository
+    counters: CounterRepository
+    rollups: RollupRepository
+    submission_archive: SubmissionArchiveRepository
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def ready(self) -> dict:
+        """Readiness details for /api/ready; raises if the backend cannot serve requests"""
+        return {}
+
+    async def ensure_indexes(self, create: bool = True) -> dict:
+        """Apply the backend's indexes and report drift. Raises IndexSetupError if a unique index failed"""
+        return {}
+
+
+def create_storage(backend: Optional[str] = None) -> Storage:
+    """Build the backend named by ``backend`` or the STORAGE_BACKEND env var (mongo | memory)"""
+    backend = (backend or os.environ.get('STORAGE_BACKEND', 'mongo')).lower()
+    if backend == "memory":
+        from storage_memory import MemoryStorage
+        return MemoryStorage()
+    if backend == "mongo":
+        from storage_mongo import MongoStorage
+        return MongoStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,593 @@
+import copy
+import time
+import logging
+import secrets
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from models import *
+from pagination import decode_cursor, decode_key_cursor, encode_cursor, encode_key_cursor
+from search import text_terms
+from storage import *
+
+
+def _project(document: dict, fields) -> dict:
+    return {field: document[field] for field in fields if field in document}
+
+
+class SortedIndex:
+    """Keys kept in ascending order; lookups and range scans are bisects"""
+
+    def __init__(self):
+        self.keys: list = []
+
+    def add(self, key):
+        insort(self.keys, key)
+
+    def remove(self, key):
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def descending(self, before=None):
+        """Keys strictly below ``before`` (all keys if None), largest first"""
+        end = bisect_left(self.keys, before) if before is not None else len(self.keys)
+        for position in range(end - 1, -1, -1):
+            yield self.keys[position]
+
+    def between(self, low=None, high=None) -> list:
+        """Snapshot of keys in [low, high), smallest first"""
+        start = bisect_left(self.keys, low) if low is not None else 0
+        end = bisect_left(self.keys, high) if high is not None else len(self.keys)
+        return self.keys[start:end]
+
+
+class MemorySubmissionRepository(SubmissionRepository):
+    FILTER_FIELDS = ("status", "service_type", "urgency")
+
+    def __init__(self):
+        self._by_id: Dict[str, dict] = {}
+        self._by_reference: Dict[str, str] = {}
+        self._order = SortedIndex()
+        self._by_field: Dict[tuple, SortedIndex] = defaultdict(SortedIndex)
+        self._by_search: Dict[str, SortedIndex] = defaultdict(SortedIndex)
+        self._by_term: Dict[str, set] = defaultdict(set)
+        self._fields = list(ContactSubmission.model_fields)
+
+    @staticmethod
+    def _key(document: dict) -> tuple:
+        return (document["created_at"], document["id"])
+
+    @staticmethod
+    def _terms(document: dict) -> set:
+        return text_terms(f"{document.get('message') or ''} {document.get('document_type') or ''}")
+
+    def _store(self, record: dict):
+        document = dict(record)
+        key = self._key(document)
+        self._by_id[document["id"]] = document
+        self._by_reference[document["reference"]] = document["id"]
+        self._order.add(key)
+        for field in self.FILTER_FIELDS:
+            self._by_field[(field, document.get(field))].add(key)
+        for field in SEARCH_FIELDS.values():
+            if document.get(field) is not None:
+                self._by_search[field].add((document[field], document["id"]))
+        for term in self._terms(document):
+            self._by_term[term].add(key)
+
+    def _unstore(self, id: str) -> dict:
+        document = self._by_id.pop(id)
+        key = self._key(document)
+        del self._by_reference[document["reference"]]
+        self._order.remove(key)
+        for field in self.FILTER_FIELDS:
+            self._by_field[(field, document.get(field))].remove(key)
+        for field in SEARCH_FIELDS.values():
+            if document.get(field) is not None:
+                self._by_search[field].remove((document[field], document["id"]))
+        for term in self._terms(document):
+            self._by_term[term].discard(key)
+        return document
+
+    def _free_reference(self, record: dict):
+        original = record["reference"]
+        while record["reference"] in self._by_reference:
+            record["reference"] = f"{original}-{secrets.token_hex(2).upper()}"
+        return original
+
+    async def insert(self, record: dict) -> dict:
+        self._free_reference(record)
+        self._store(record)
+        return record
+
+    async def insert_many(self, records: List[dict]):
+        for record in records:
+            if record["id"] in self._by_id:
+                continue
+            original = self._free_reference(record)
+            if record["reference"] != original:
+                logging.warning("Reference %s collided, stored submission %s as %s", original, record['id'], record['reference'])
+            self._store(record)
+
+    async def list_page(self, limit, cursor=None, **filters):
+        filters = {field: value for field, value in filters.items() if value is not None}
+        index = self._order
+        for field, value in filters.items():
+            if field in self.FILTER_FIELDS:
+                index = self._by_field[(field, value)]
+                break
+        before = decode_cursor(cursor) if cursor else None
+
+        documents = []
+        for key in index.descending(before):
+            document = self._by_id[key[1]]
+            if all(document.get(field) == value for field, value in filters.items()):
+                documents.append(_project(document, self._fields))
+                if len(documents) > limit:
+                    break
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return documents, next_cursor
+
+    async def iter_range(self, start=None, end=None, batch_size=1000):
+        for key in self._order.between((start,) if start else None, (end,) if end else None):
+            document = self._by_id.get(key[1])
+            if document is not None:
+                yield dict(document)
+
+    async def count_by(self, field: str) -> Dict[str, int]:
+        counts = defaultdict(int)
+        for document in self._by_id.values():
+            counts[str(document.get(field))] += 1
+        return dict(counts)
+
+    async def dedupe_references(self):
+        # References are made unique on insert, so duplicates cannot exist here
+        return {"groups": 0, "renamed": 0}
+
+    async def get_many(self, ids):
+        return [_project(self._by_id[id], self._fields) for id in ids if id in self._by_id]
+
+    async def transition_status(self, changes, now):
+        updated = []
+        for id, from_status, expected_updated_at, to_status in changes:
+            document = self._by_id.get(id)
+            if document is None or document["status"] != from_status:
+                continue
+            if expected_updated_at is not None and document["updated_at"] != expected_updated_at:
+                continue
+            self._store({**self._unstore(id), "status": to_status, "updated_at": now})
+            updated.append(id)
+        return updated
+
+    async def retention_candidates(self, statuses, completed_before, created_before, limit=0, batch_size=1000):
+        ids = set()
+        if completed_before and statuses:
+            for status in statuses:
+                for key in self._by_field[("status", status)].keys:
+                    if self._by_id[key[1]]["updated_at"] < completed_before:
+                        ids.add(key[1])
+        if created_before:
+            ids.update(id for _, id in self._order.between(None, (created_before,)))
+        for count, id in enumerate(ids):
+            if limit and count >= limit:
+                break
+            yield dict(self._by_id[id])
+
+    async def delete_unchanged(self, documents):
+        deleted = []
+        for document in documents:
+            current = self._by_id.get(document["id"])
+            if current is not None and current["updated_at"] == document["updated_at"]:
+                self._unstore(document["id"])
+                deleted.append(document["id"])
+        return deleted
+
+    async def set_fields(self, updates):
+        for id, fields in updates:
+            if id in self._by_id:
+                self._store({**self._unstore(id), **fields})
+
+    async def search(self, mode, value, limit, cursor=None):
+        if mode == "reference":
+            id = self._by_reference.get(value)
+            return ([_project(self._by_id[id], self._fields)] if id else []), None
+
+        if mode == "text":
+            # Any of the terms matches, like Mongo's $text (which also stems; this does not)
+            keys = set().union(*(self._by_term.get(term, ()) for term in text_terms(value)))
+            before = decode_cursor(cursor) if cursor else None
+            keys = sorted((key for key in keys if before is None or key < before), reverse=True)[:limit + 1]
+            documents = [_project(self._by_id[id], self._fields) for _, id in keys]
+        else:
+            field = SEARCH_FIELDS[mode]
+            keys = self._by_search[field].keys
+            start = bisect_left(keys, (value,))
+            if cursor:
+                start = max(start, bisect_right(keys, decode_key_cursor(cursor)))
+            documents = []
+            for key in keys[start:]:
+                if not key[0].startswith(value) or len(documents) > limit:
+                    break
+                documents.append({**_project(self._by_id[key[1]], self._fields), field: key[0]})
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = (encode_cursor(last["created_at"], last["id"]) if mode == "text"
+                           else encode_key_cursor(last[SEARCH_FIELDS[mode]], last["id"]))
+        return documents, next_cursor
+
+
+class MemoryServiceRepository(ServiceRepository):
+    def __init__(self, model):
+        self._documents: List[dict] = []
+        self._fields = list(model.model_fields)
+
+    async def insert(self, document: dict):
+        self._documents.append(dict(document))
+
+    async def count(self) -> int:
+        return len(self._documents)
+
+    async def list_active(self) -> List[dict]:
+        return [_project(document, self._fields) for document in self._documents if document.get("active")][:100]
+
+
+class MemoryTestimonialRepository(TestimonialRepository):
+    def __init__(self):
+        self._by_id: Dict[str, dict] = {}
+        self._order = SortedIndex()
+        self._fields = list(Testimonial.model_fields)
+
+    async def insert(self, document: dict):
+        self._by_id[document["id"]] = dict(document)
+        self._order.add((document["created_at"], document["id"]))
+
+    async def list_active(self, limit: int = 10) -> List[dict]:
+        testimonials = []
+        for key in self._order.descending():
+            if len(testimonials) >= limit:
+                break
+            document = self._by_id[key[1]]
+            if document.get("active") and document.get("verified"):
+                testimonials.append(_project(document, self._fields))
+        return testimonials
+
+    async def verify(self, testimonial_id: str) -> Optional[dict]:
+        document = self._by_id.get(testimonial_id)
+        if document is None or document.get("verified"):
+            return None
+        document["verified"] = True
+        return _project(document, self._fields)
+
+    async def rating_summary(self) -> dict:
+        summary = {"verified": 0, "pending": 0, "rating_sum": 0}
+        for document in self._by_id.values():
+            if not document.get("active"):
+                continue
+            if document.get("verified"):
+                summary["verified"] += 1
+                summary["rating_sum"] += document["rating"]
+            else:
+                summary["pending"] += 1
+        return summary
+
+
+class MemoryConfigRepository(ConfigRepository):
+    def __init__(self):
+        self._by_key: Dict[str, dict] = {}
+
+    async def insert(self, document: dict):
+        self._by_key[document["key"]] = dict(document)
+
+    async def get(self, key: str) -> Optional[dict]:
+        config = self._by_key.get(key)
+        return config["data"] if config else None
+
+    async def set(self, key: str, data: dict):
+        config = self._by_key.setdefault(key, {"key": key})
+        config["data"] = data
+        config["updated_at"] = datetime.utcnow()
+
+    async def get_version(self) -> int:
+        return self._by_key.get(CONFIG_VERSION_KEY, {}).get("version", 0)
+
+    async def bump_version(self) -> int:
+        stamp = self._by_key.setdefault(CONFIG_VERSION_KEY, {"key": CONFIG_VERSION_KEY, "version": 0})
+        stamp["version"] += 1
+        stamp["updated_at"] = datetime.utcnow()
+        return stamp["version"]
+
+
+class MemorySubscriptionRepository(SubscriptionRepository):
+    def __init__(self):
+        self._by_id: Dict[str, dict] = {}
+        self._active_by_email: Dict[str, str] = {}
+        self._order = SortedIndex()
+
+    def _subscribe(self, document: dict) -> bool:
+        if document["email"] in self._active_by_email:
+            return False
+        self._by_id[document["id"]] = dict(document)
+        self._active_by_email[document["email"]] = document["id"]
+        self._order.add((document["subscribed_at"], document["id"]))
+        return True
+
+    async def subscribe(self, document: dict) -> bool:
+        return self._subscribe(document)
+
+    async def bulk_subscribe(self, documents: List[dict]) -> List[str]:
+        return [SUBSCRIBED if self._subscribe(document) else ALREADY_SUBSCRIBED for document in documents]
+
+    async def iter_range(self, start=None, end=None, batch_size=1000):
+        for key in self._order.between((start,) if start else None, (end,) if end else None):
+            document = self._by_id.get(key[1])
+            if document is not None:
+                yield dict(document)
+
+    def _expire(self):
+        """Stand-in for Mongo's TTL monitor"""
+        now = datetime.utcnow()
+        for id, document in list(self._by_id.items()):
+            if not document["active"] and document.get("expires_at") and document["expires_at"] <= now:
+                del self._by_id[id]
+                self._order.remove((document["subscribed_at"], id))
+
+    async def dedupe_active(self):
+        # _active_by_email admits one active subscription per address
+        return {"groups": 0, "deactivated": 0}
+
+    async def unsubscribe(self, email, expires_at):
+        id = self._active_by_email.pop(email, None)
+        if id is None:
+            return False
+        self._by_id[id].update(active=False, unsubscribed_at=datetime.utcnow(), expires_at=expires_at)
+        return True
+
+    async def schedule_expiry(self, ttl, dry_run=False):
+        self._expire()
+        pending = [document for document in self._by_id.values()
+                   if not document["active"] and document.get("expires_at") is None]
+        if not dry_run:
+            for document in pending:
+                document["expires_at"] = (document.get("unsubscribed_at") or document["subscribed_at"]) + ttl
+            self._expire()
+        return len(pending)
+
+    async def retention_counts(self):
+        self._expire()
+        inactive = [document for document in self._by_id.values() if not document["active"]]
+        return {
+            "active": len(self._by_id) - len(inactive),
+            "inactive": len(inactive),
+            "scheduled_to_expire": sum(1 for document in inactive if document.get("expires_at") is not None),
+        }
+
+
+class MemoryRateLimitRepository(RateLimitRepository):
+    def __init__(self):
+        self._hits: Dict[str, list] = {}
+
+    async def hit(self, key: str, window: int) -> int:
+        window_start = int(time.time()) // window * window
+        counter = self._hits.get(key)
+        if counter is None or counter[0] != window_start:
+            if len(self._hits) > 10000:
+                self._hits = {k: c for k, c in self._hits.items() if c[0] >= window_start}
+            counter = self._hits[key] = [window_start, 0]
+        counter[1] += 1
+        return counter[1]
+
+
+class MemoryIdempotencyRepository(IdempotencyRepository):
+    def __init__(self):
+        self._records: Dict[str, dict] = {}
+
+    async def reserve(self, key: str, fingerprint: str, ttl: float) -> Optional[dict]:
+        existing = await self.get(key)
+        if existing is not None:
+            return dict(existing)
+        if len(self._records) > 10000:
+            now = time.monotonic()
+            self._records = {k: r for k, r in self._records.items() if r["expires_at"] > now}
+        self._records[key] = {"fingerprint": fingerprint, "status": IDEMPOTENCY_PENDING,
+                              "expires_at": time.monotonic() + ttl}
+        return None
+
+    async def get(self, key: str) -> Optional[dict]:
+        record = self._records.get(key)
+        if record is None or record["expires_at"] <= time.monotonic():
+            self._records.pop(key, None)
+            return None
+        return record
+
+    async def complete(self, key: str, response: dict):
+        if key in self._records:
+            self._records[key].update(status=IDEMPOTENCY_COMPLETED, response=response)
+
+    async def release(self, key: str):
+        record = self._records.get(key)
+        if record is not None and record["status"] == IDEMPOTENCY_PENDING:
+            del self._records[key]
+
+
+class MemoryJobRepository(JobRepository):
+    def __init__(self):
+        self._by_id: Dict[str, dict] = {}
+        self._done = 0
+
+    async def enqueue(self, jobs: List[dict]):
+        for job in jobs:
+            self._by_id[job["id"]] = dict(job)
+
+    async def claim(self, lease: float) -> Optional[dict]:
+        now = datetime.utcnow()
+        due = [
+            job for job in self._by_id.values()
+            if (job["status"] == JOB_PENDING and job["run_at"] <= now)
+            or (job["status"] == JOB_RUNNING and job["locked_until"] <= now)
+        ]
+        if not due:
+            return None
+        job = min(due, key=lambda job: job["run_at"])
+        job.update(status=JOB_RUNNING, locked_until=now + timedelta(seconds=lease), updated_at=now)
+        job["attempts"] += 1
+        return dict(job)
+
+    def _finish(self, job_id: str, **fields):
+        job = self._by_id.get(job_id)
+        if job is not None:
+            job.update(fields, locked_until=None, updated_at=datetime.utcnow())
+
+    async def complete(self, job_id: str):
+        # Finished jobs are only counted, so the outbox stays as small as the backlog
+        if self._by_id.pop(job_id, None) is not None:
+            self._done += 1
+
+    async def retry(self, job_id: str, run_at: datetime, error: str):
+        self._finish(job_id, status=JOB_PENDING, run_at=run_at, last_error=error)
+
+    async def dead_letter(self, job_id: str, error: str):
+        self._finish(job_id, status=JOB_DEAD, last_error=error)
+
+    async def requeue_dead(self, job_id: str) -> bool:
+        job = self._by_id.get(job_id)
+        if job is None or job["status"] != JOB_DEAD:
+            return False
+        self._finish(job_id, status=JOB_PENDING, attempts=0, run_at=datetime.utcnow())
+        return True
+
+    async def counts(self) -> dict:
+        counts = {status: 0 for status in (JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_DEAD)}
+        for job in self._by_id.values():
+            counts[job["status"]] += 1
+        counts[JOB_DONE] = self._done
+        return counts
+
+
+class MemoryCounterRepository(CounterRepository):
+    def __init__(self):
+        self._counters: Dict[str, dict] = {}
+
+    async def increment(self, name: str, amounts: Dict[str, int]):
+        counter = self._counters.setdefault(name, {"_id": name})
+        for path, amount in amounts.items():
+            *parents, field = path.split(".")
+            target = counter
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[field] = target.get(field, 0) + amount
+        counter["updated_at"] = datetime.utcnow()
+
+    async def get(self, name: str) -> Optional[dict]:
+        counter = self._counters.get(name)
+        return copy.deepcopy(counter) if counter else None
+
+    async def replace(self, name: str, values: dict):
+        self._counters[name] = {**copy.deepcopy(values), "_id": name, "updated_at": datetime.utcnow()}
+
+
+class MemoryRollupRepository(RollupRepository):
+    def __init__(self):
+        self._rollups: Dict[tuple, dict] = {}
+        self._buckets: Dict[str, SortedIndex] = defaultdict(SortedIndex)
+
+    async def increment(self, buckets, amounts):
+        await self.increment_many({bucket: amounts for bucket in buckets})
+
+    async def increment_many(self, amounts):
+        for (granularity, bucket), bucket_amounts in amounts.items():
+            rollup = self._rollups.get((granularity, bucket))
+            if rollup is None:
+                rollup = self._rollups[(granularity, bucket)] = {"granularity": granularity, "bucket": bucket}
+                self._buckets[granularity].add(bucket)
+            for path, amount in bucket_amounts.items():
+                *parents, field = path.split(".")
+                target = rollup
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[field] = target.get(field, 0) + amount
+
+    async def list_range(self, granularity, start, end):
+        return [copy.deepcopy(self._rollups[(granularity, bucket)])
+                for bucket in self._buckets[granularity].between(start, end)]
+
+    async def replace_range(self, granularity, start, end, rollups):
+        for bucket in self._buckets[granularity].between(start, end):
+            self._buckets[granularity].remove(bucket)
+            del self._rollups[(granularity, bucket)]
+        for rollup in rollups:
+            self._rollups[(granularity, rollup["bucket"])] = copy.deepcopy(rollup)
+            self._buckets[granularity].add(rollup["bucket"])
+
+
+class MemorySubmissionArchiveRepository(SubmissionArchiveRepository):
+    def __init__(self):
+        self._by_id: Dict[str, dict] = {}
+        self._by_reference: Dict[str, str] = {}
+
+    async def store(self, records):
+        for record in records:
+            self._by_id[record["id"]] = dict(record)
+            self._by_reference[record["reference"]] = record["id"]
+
+    async def remove(self, ids):
+        for id in ids:
+            record = self._by_id.pop(id, None)
+            if record is not None:
+                self._by_reference.pop(record["reference"], None)
+
+    async def get_by_reference(self, reference):
+        id = self._by_reference.get(reference)
+        return dict(self._by_id[id]) if id else None
+
+    async def iter_range(self, start=None, end=None, batch_size=1000):
+        records = sorted(self._by_id.values(), key=lambda record: record["created_at"])
+        for record in records:
+            if (start is None or record["created_at"] >= start) and (end is None or record["created_at"] < end):
+                yield {field: value for field, value in record.items() if field != "data"}
+
+    async def count_by(self, field):
+        counts = defaultdict(int)
+        for record in self._by_id.values():
+            counts[str(record.get(field))] += 1
+        return dict(counts)
+
+    async def stats(self):
+        return {
+            "count": len(self._by_id),
+            "raw_bytes": sum(record["raw_size"] for record in self._by_id.values()),
+            "stored_bytes": sum(record["size"] for record in self._by_id.values()),
+        }
+
+
+class MemoryStorage(Storage):
+    """Process-local storage for tests, load testing and Mongo-less dev environments.
+
+    Every operation completes without awaiting, so each call is atomic on the
+    event loop. Data does not survive restarts or span workers.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.submissions = MemorySubmissionRepository()
+        self.services = MemoryServiceRepository(ServiceResponse)
+        self.additional_services = MemoryServiceRepository(AdditionalService)
+        self.testimonials = MemoryTestimonialRepository()
+        self.configs = MemoryConfigRepository()
+        self.subscriptions = MemorySubscriptionRepository()
+        self.rate_limits = MemoryRateLimitRepository()
+        self.idempotency_keys = MemoryIdempotencyRepository()
+        self.jobs = MemoryJobRepository()
+        self.counters = MemoryCounterRepository()
+        self.rollups = MemoryRollupRepository()
+        self.submission_archive = MemorySubmissionArchiveRepository()
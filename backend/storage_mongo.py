@@ -0,0 +1,802 @@
+import os
+import re
+import time
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, DeleteOne, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from models import *
+from metrics import mongo_command_metrics, mongo_pool_metrics
+from pagination import decode_key_cursor, encode_cursor, encode_key_cursor, keyset_filter
+from serializers import model_projection
+from storage import *
+
+# Index registry: every index the queries in this module rely on, keyed by collection.
+# ensure_indexes() applies it at startup and reports drift against what is deployed.
+INDEXES = {
+    "business_configs": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    ],
+    "contact_submissions": [
+        IndexModel([("reference", ASCENDING)], name="reference_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_at_id"),
+        IndexModel([("service_type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="service_type_created_at_id"),
+        IndexModel([("urgency", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="urgency_created_at_id"),
+        # Admin search: prefix ranges on the normalized fields, paged by (field, id)
+        IndexModel([("name_lc", ASCENDING), ("id", ASCENDING)], name="name_lc_id"),
+        IndexModel([("email_lc", ASCENDING), ("id", ASCENDING)], name="email_lc_id"),
+        IndexModel([("phone_digits", ASCENDING), ("id", ASCENDING)], name="phone_digits_id"),
+        # Retention: final-status submissions by last update
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated_at"),
+        IndexModel([("message", TEXT), ("document_type", TEXT)], name="message_document_type_text"),
+    ],
+    "testimonials": [
+        IndexModel([("active", ASCENDING), ("verified", ASCENDING), ("created_at", DESCENDING)], name="active_verified_created_at"),
+    ],
+    "email_subscriptions": [
+        # At most one active subscription per address; backs the atomic subscribe upsert
+        IndexModel(
+            [("email", ASCENDING)], name="email_active_unique", unique=True,
+            partialFilterExpression={"active": True}
+        ),
+        IndexModel([("subscribed_at", ASCENDING)], name="subscribed_at"),
+        # Inactive subscriptions are deleted at expires_at (see the retention policy)
+        IndexModel(
+            [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0,
+            partialFilterExpression={"active": False}
+        ),
+    ],
+    "contact_submissions_archive": [
+        IndexModel([("reference", ASCENDING)], name="reference"),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+    "services": [
+        IndexModel([("active", ASCENDING)], name="active"),
+    ],
+    "idempotency_keys": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "outbox_jobs": [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name="status_locked_until"),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Delivered jobs are kept for a week for troubleshooting
+        IndexModel(
+            [("updated_at", ASCENDING)], name="done_ttl", expireAfterSeconds=7 * 86400,
+            partialFilterExpression={"status": "done"}
+        ),
+    ],
+    "submission_rollups": [
+        IndexModel([("granularity", ASCENDING), ("bucket", ASCENDING)], name="granularity_bucket"),
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "additional_services": [
+        IndexModel([("active", ASCENDING)], name="active"),
+    ],
+}
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+# MONGO_* environment variable -> (MongoClient option, parser). Unset variables keep the driver default
+CLIENT_OPTIONS = {
+    'MONGO_MAX_POOL_SIZE': ('maxPoolSize', int),
+    'MONGO_MIN_POOL_SIZE': ('minPoolSize', int),
+    'MONGO_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', int),
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS': ('waitQueueTimeoutMS', int),
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', int),
+    'MONGO_CONNECT_TIMEOUT_MS': ('connectTimeoutMS', int),
+    'MONGO_SOCKET_TIMEOUT_MS': ('socketTimeoutMS', int),
+    'MONGO_COMPRESSORS': ('compressors', str),
+    'MONGO_ZLIB_COMPRESSION_LEVEL': ('zlibCompressionLevel', int),
+    'MONGO_READ_PREFERENCE': ('readPreference', str),
+    'MONGO_APP_NAME': ('appname', str),
+}
+
+
+def client_options(environ=os.environ) -> dict:
+    """Motor client options from MONGO_* env vars.
+
+    maxPoolSize applies per process, so with N uvicorn workers the server sees
+    up to N * MONGO_MAX_POOL_SIZE connections. Compressors (e.g. "zstd,snappy")
+    the driver cannot load are skipped with a warning.
+    """
+    options = {}
+    for variable, (option, parse) in CLIENT_OPTIONS.items():
+        value = environ.get(variable)
+        if value not in (None, ""):
+            options[option] = parse(value)
+    return options
+
+
+def _index_spec(index: dict) -> dict:
+    """Normalise an index document for comparison"""
+    key = dict(index["key"])
+    if "_fts" in key or TEXT in key.values():
+        # The server reports text indexes as _fts/_ftsx keys plus per-field weights
+        fields = index.get("weights") or {field for field, direction in key.items() if direction == TEXT}
+        key = {field: TEXT for field in sorted(fields)}
+    spec = {"key": [(field, direction) for field, direction in key.items()]}
+    for option in INDEX_OPTIONS:
+        if option in index:
+            spec[option] = index[option]
+    return spec
+
+
+def _date_range(field: str, start: datetime = None, end: datetime = None) -> dict:
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+
+def _suffixed_reference(reference: str) -> str:
+    return f"{reference}-{secrets.token_hex(2).upper()}"
+
+
+class MongoSubmissionRepository(SubmissionRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, record: dict) -> dict:
+        for attempt in range(3):
+            try:
+                await self.collection.insert_one(record)
+                return record
+            except DuplicateKeyError as e:
+                if "reference" not in str(e) or attempt == 2:
+                    raise
+                record.pop("_id", None)
+                record["reference"] = _suffixed_reference(record["reference"])
+
+    async def insert_many(self, records: List[dict]):
+        try:
+            await self.collection.insert_many(records, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != 11000:
+                    raise
+                await self._resolve_duplicate(error)
+
+    async def _resolve_duplicate(self, error: dict):
+        """Duplicate keys are either replays of stored documents or reference collisions"""
+        document = dict(error["op"])
+        if "reference" not in error.get("keyPattern", {}) and "reference" not in error.get("errmsg", ""):
+            return
+        if await self.collection.find_one({"id": document["id"]}, {"_id": 1}):
+            return
+        document.pop("_id", None)
+        original = document["reference"]
+        document["reference"] = _suffixed_reference(original)
+        logging.warning("Reference %s collided, stored submission %s as %s", original, document['id'], document['reference'])
+        await self.collection.insert_one(document)
+
+    async def list_page(self, limit, cursor=None, **filters):
+        query = {field: value for field, value in filters.items() if value is not None}
+        query.update(keyset_filter(cursor))
+        documents = await self.collection.find(query, model_projection(ContactSubmission)).sort(
+            [("created_at", -1), ("id", -1)]
+        ).limit(limit + 1).to_list(limit + 1)
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return documents, next_cursor
+
+    def iter_range(self, start=None, end=None, batch_size=1000):
+        return self.collection.find(
+            _date_range("created_at", start, end), {"_id": 0}
+        ).sort("created_at", 1).batch_size(batch_size)
+
+    async def count_by(self, field: str) -> Dict[str, int]:
+        counts = {}
+        async for row in self.collection.aggregate([{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]):
+            counts[str(row["_id"])] = row["count"]
+        return counts
+
+    async def dedupe_references(self):
+        groups = renamed = 0
+        duplicates = self.collection.aggregate([
+            {"$group": {"_id": "$reference", "count": {"$sum": 1},
+                        "documents": {"$push": {"_id": "$_id", "created_at": "$created_at"}}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ], allowDiskUse=True)
+        async for group in duplicates:
+            groups += 1
+            documents = sorted(group["documents"], key=lambda document: (document["created_at"], str(document["_id"])))
+            for document in documents[1:]:
+                reference = _suffixed_reference(group["_id"])
+                while await self.collection.find_one({"reference": reference}, {"_id": 1}):
+                    reference = _suffixed_reference(group["_id"])
+                await self.collection.update_one({"_id": document["_id"]}, {"$set": {"reference": reference}})
+                logging.warning("Duplicate reference %s: renamed submission %s to %s", group['_id'], document['_id'], reference)
+                renamed += 1
+        return {"groups": groups, "renamed": renamed}
+
+    async def get_many(self, ids):
+        return await self.collection.find({"id": {"$in": ids}}, model_projection(ContactSubmission)).to_list(None)
+
+    async def transition_status(self, changes, now):
+        if not changes:
+            return []
+        operations = []
+        for id, from_status, expected_updated_at, to_status in changes:
+            query = {"id": id, "status": from_status}
+            if expected_updated_at is not None:
+                query["updated_at"] = expected_updated_at
+            operations.append(UpdateOne(query, {"$set": {"status": to_status, "updated_at": now}}))
+        await self.collection.bulk_write(operations, ordered=False)
+        # The write result only has totals; read back which changes took effect
+        targets = {id: to_status for id, _, _, to_status in changes}
+        updated = await self.collection.find(
+            {"id": {"$in": list(targets)}, "updated_at": now}, {"_id": 0, "id": 1, "status": 1}
+        ).to_list(None)
+        return [document["id"] for document in updated if targets[document["id"]] == document["status"]]
+
+    def retention_candidates(self, statuses, completed_before, created_before, limit=0, batch_size=1000):
+        clauses = []
+        if completed_before and statuses:
+            clauses.append({"status": {"$in": statuses}, "updated_at": {"$lt": completed_before}})
+        if created_before:
+            clauses.append({"created_at": {"$lt": created_before}})
+        # Each $or clause is served by its own index (status_updated_at, created_at_id)
+        query = {"$or": clauses} if clauses else {"_id": None}
+        return self.collection.find(query, {"_id": 0}).limit(limit).batch_size(batch_size)
+
+    async def delete_unchanged(self, documents):
+        if not documents:
+            return []
+        await self.collection.bulk_write(
+            [DeleteOne({"id": document["id"], "updated_at": document["updated_at"]}) for document in documents],
+            ordered=False
+        )
+        ids = [document["id"] for document in documents]
+        remaining = {document["id"] async for document in self.collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})}
+        return [id for id in ids if id not in remaining]
+
+    async def set_fields(self, updates):
+        if updates:
+            await self.collection.bulk_write(
+                [UpdateOne({"id": id}, {"$set": fields}) for id, fields in updates], ordered=False
+            )
+
+    async def search(self, mode, value, limit, cursor=None):
+        projection = model_projection(ContactSubmission)
+        if mode == "reference":
+            document = await self.collection.find_one({"reference": value}, projection)
+            return ([document] if document else []), None
+
+        if mode == "text":
+            query = {"$text": {"$search": value}}
+            query.update(keyset_filter(cursor))
+            sort = [("created_at", -1), ("id", -1)]
+        else:
+            field = SEARCH_FIELDS[mode]
+            # An anchored, escaped regex is a bounded range scan on the (field, id) index
+            query = {field: {"$regex": f"^{re.escape(value)}"}}
+            if cursor:
+                key, id = decode_key_cursor(cursor)
+                query = {"$and": [query, {"$or": [{field: {"$gt": key}}, {field: key, "id": {"$gt": id}}]}]}
+            sort = [(field, 1), ("id", 1)]
+            projection = {**projection, field: 1}
+
+        documents = await self.collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = (encode_cursor(last["created_at"], last["id"]) if mode == "text"
+                           else encode_key_cursor(last[SEARCH_FIELDS[mode]], last["id"]))
+        return documents, next_cursor
+
+
+class MongoServiceRepository(ServiceRepository):
+    def __init__(self, collection, model):
+        self.collection = collection
+        self.projection = model_projection(model)
+
+    async def insert(self, document: dict):
+        await self.collection.insert_one(document)
+
+    async def count(self) -> int:
+        return await self.collection.count_documents({})
+
+    async def list_active(self) -> List[dict]:
+        return await self.collection.find({"active": True}, self.projection).to_list(100)
+
+
+class MongoTestimonialRepository(TestimonialRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, document: dict):
+        await self.collection.insert_one(document)
+
+    async def list_active(self, limit: int = 10) -> List[dict]:
+        return await self.collection.find(
+            {"active": True, "verified": True}, model_projection(Testimonial)
+        ).sort("created_at", -1).limit(limit).to_list(limit)
+
+    async def verify(self, testimonial_id: str) -> Optional[dict]:
+        return await self.collection.find_one_and_update(
+            {"id": testimonial_id, "verified": False},
+            {"$set": {"verified": True}},
+            projection=model_projection(Testimonial),
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def rating_summary(self) -> dict:
+        summary = {"verified": 0, "pending": 0, "rating_sum": 0}
+        async for row in self.collection.aggregate([
+            {"$match": {"active": True}},
+            {"$group": {"_id": "$verified", "count": {"$sum": 1}, "rating_sum": {"$sum": "$rating"}}},
+        ]):
+            if row["_id"]:
+                summary.update(verified=row["count"], rating_sum=row["rating_sum"])
+            else:
+                summary["pending"] = row["count"]
+        return summary
+
+
+class MongoConfigRepository(ConfigRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, document: dict):
+        await self.collection.insert_one(document)
+
+    async def get(self, key: str) -> Optional[dict]:
+        config = await self.collection.find_one({"key": key}, {"data": 1})
+        return config["data"] if config else None
+
+    async def set(self, key: str, data: dict):
+        await self.collection.update_one(
+            {"key": key},
+            {"$set": {"data": data, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def get_version(self) -> int:
+        stamp = await self.collection.find_one({"key": CONFIG_VERSION_KEY}, {"version": 1})
+        return stamp["version"] if stamp else 0
+
+    async def bump_version(self) -> int:
+        for attempt in range(2):
+            try:
+                stamp = await self.collection.find_one_and_update(
+                    {"key": CONFIG_VERSION_KEY},
+                    {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                    upsert=True, return_document=ReturnDocument.AFTER, projection={"version": 1}
+                )
+                return stamp["version"]
+            except DuplicateKeyError:
+                # Two workers created the stamp at once; the retry increments the winner's
+                if attempt:
+                    raise
+
+    async def watch_version(self):
+        # Requires a replica set; raises OperationFailure on a standalone server
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        async with self.collection.watch(pipeline, full_document="updateLookup") as stream:
+            yield await self.get_version()
+            async for change in stream:
+                stamp = change.get("fullDocument") or {}
+                if stamp.get("key") == CONFIG_VERSION_KEY:
+                    yield stamp["version"]
+
+
+class MongoSubscriptionRepository(SubscriptionRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def subscribe(self, document: dict) -> bool:
+        try:
+            result = await self.collection.update_one(
+                {"email": document["email"], "active": True},
+                {"$setOnInsert": document},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # A concurrent request inserted the same address between our match and insert
+            return False
+        return result.upserted_id is not None
+
+    async def bulk_subscribe(self, documents: List[dict]) -> List[str]:
+        if not documents:
+            return []
+        operations = [
+            UpdateOne({"email": document["email"], "active": True}, {"$setOnInsert": document}, upsert=True)
+            for document in documents
+        ]
+        write_errors = {}
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            upserted = set(result.upserted_ids)
+        except BulkWriteError as e:
+            upserted = {item["index"] for item in e.details.get("upserted", [])}
+            write_errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+        outcomes = []
+        for index in range(len(documents)):
+            if index in upserted:
+                outcomes.append(SUBSCRIBED)
+            elif index in write_errors and write_errors[index].get("code") != 11000:
+                outcomes.append(SUBSCRIBE_ERROR)
+            else:
+                outcomes.append(ALREADY_SUBSCRIBED)
+        return outcomes
+
+    def iter_range(self, start=None, end=None, batch_size=1000):
+        return self.collection.find(
+            _date_range("subscribed_at", start, end), {"_id": 0}
+        ).sort("subscribed_at", 1).batch_size(batch_size)
+
+    async def dedupe_active(self):
+        groups = deactivated = 0
+        duplicates = self.collection.aggregate([
+            {"$match": {"active": True}},
+            {"$group": {"_id": "$email", "count": {"$sum": 1},
+                        "documents": {"$push": {"_id": "$_id", "subscribed_at": "$subscribed_at"}}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ], allowDiskUse=True)
+        now = datetime.utcnow()
+        async for group in duplicates:
+            groups += 1
+            documents = sorted(group["documents"], key=lambda document: (document["subscribed_at"], str(document["_id"])))
+            result = await self.collection.update_many(
+                {"_id": {"$in": [document["_id"] for document in documents[1:]]}},
+                {"$set": {"active": False, "unsubscribed_at": now}}
+            )
+            deactivated += result.modified_count
+        return {"groups": groups, "deactivated": deactivated}
+
+    async def unsubscribe(self, email, expires_at):
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"email": email, "active": True},
+            {"$set": {"active": False, "unsubscribed_at": now, "expires_at": expires_at}}
+        )
+        return result.modified_count == 1
+
+    async def schedule_expiry(self, ttl, dry_run=False):
+        query = {"active": False, "expires_at": None}
+        if dry_run:
+            return await self.collection.count_documents(query)
+        result = await self.collection.update_many(query, [{"$set": {"expires_at": {"$add": [
+            {"$ifNull": ["$unsubscribed_at", "$subscribed_at"]}, int(ttl.total_seconds() * 1000)
+        ]}}}])
+        return result.modified_count
+
+    async def retention_counts(self):
+        active, inactive, expiring = await asyncio.gather(
+            self.collection.count_documents({"active": True}),
+            self.collection.count_documents({"active": False}),
+            self.collection.count_documents({"active": False, "expires_at": {"$ne": None}})
+        )
+        return {"active": active, "inactive": inactive, "scheduled_to_expire": expiring}
+
+
+class MongoRateLimitRepository(RateLimitRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def hit(self, key: str, window: int) -> int:
+        window_start = int(time.time()) // window * window
+        update = {
+            "$inc": {"hits": 1},
+            "$setOnInsert": {"expires_at": datetime.utcfromtimestamp(window_start + 2 * window)},
+        }
+        for attempt in range(2):
+            try:
+                counter = await self.collection.find_one_and_update(
+                    {"_id": f"{key}:{window_start}"}, update,
+                    upsert=True, return_document=ReturnDocument.AFTER, projection={"hits": 1}
+                )
+                return counter["hits"]
+            except DuplicateKeyError:
+                # Lost the upsert race to another worker; the retry increments its document
+                if attempt:
+                    raise
+
+
+class MongoIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def reserve(self, key: str, fingerprint: str, ttl: float) -> Optional[dict]:
+        for attempt in range(3):
+            now = datetime.utcnow()
+            record = {
+                "_id": key, "fingerprint": fingerprint, "status": IDEMPOTENCY_PENDING,
+                "created_at": now, "expires_at": now + timedelta(seconds=ttl),
+            }
+            try:
+                await self.collection.insert_one(record)
+                return None
+            except DuplicateKeyError:
+                pass
+            # The TTL monitor may not have deleted an expired record yet; take it over atomically
+            result = await self.collection.replace_one({"_id": key, "expires_at": {"$lte": now}}, record)
+            if result.matched_count:
+                return None
+            existing = await self.get(key)
+            if existing is not None:
+                return existing
+            # Released or deleted between the writes and the read
+        raise RuntimeError(f"Could not reserve idempotency key {key}")
+
+    async def get(self, key: str) -> Optional[dict]:
+        record = await self.collection.find_one({"_id": key})
+        if record is None or record["expires_at"] <= datetime.utcnow():
+            # The TTL monitor only runs once a minute
+            return None
+        return record
+
+    async def complete(self, key: str, response: dict):
+        await self.collection.update_one(
+            {"_id": key}, {"$set": {"status": IDEMPOTENCY_COMPLETED, "response": response}}
+        )
+
+    async def release(self, key: str):
+        await self.collection.delete_one({"_id": key, "status": IDEMPOTENCY_PENDING})
+
+
+class MongoJobRepository(JobRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def enqueue(self, jobs: List[dict]):
+        if jobs:
+            await self.collection.insert_many(jobs, ordered=False)
+
+    async def claim(self, lease: float) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": JOB_PENDING, "run_at": {"$lte": now}},
+                {"status": JOB_RUNNING, "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": JOB_RUNNING, "locked_until": now + timedelta(seconds=lease), "updated_at": now},
+             "$inc": {"attempts": 1}},
+            sort=[("run_at", ASCENDING)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _finish(self, job_id: str, fields: dict):
+        await self.collection.update_one(
+            {"id": job_id}, {"$set": {**fields, "locked_until": None, "updated_at": datetime.utcnow()}}
+        )
+
+    async def complete(self, job_id: str):
+        await self._finish(job_id, {"status": JOB_DONE, "last_error": None})
+
+    async def retry(self, job_id: str, run_at: datetime, error: str):
+        await self._finish(job_id, {"status": JOB_PENDING, "run_at": run_at, "last_error": error})
+
+    async def dead_letter(self, job_id: str, error: str):
+        await self._finish(job_id, {"status": JOB_DEAD, "last_error": error})
+
+    async def requeue_dead(self, job_id: str) -> bool:
+        result = await self.collection.update_one(
+            {"id": job_id, "status": JOB_DEAD},
+            {"$set": {"status": JOB_PENDING, "attempts": 0, "run_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count == 1
+
+    async def counts(self) -> dict:
+        counts = {status: 0 for status in (JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_DEAD)}
+        async for row in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+
+class MongoCounterRepository(CounterRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def increment(self, name: str, amounts: Dict[str, int]):
+        await self.collection.update_one(
+            {"_id": name}, {"$inc": amounts, "$set": {"updated_at": datetime.utcnow()}}, upsert=True
+        )
+
+    async def get(self, name: str) -> Optional[dict]:
+        return await self.collection.find_one({"_id": name})
+
+    async def replace(self, name: str, values: dict):
+        await self.collection.replace_one(
+            {"_id": name}, {**values, "updated_at": datetime.utcnow()}, upsert=True
+        )
+
+
+def _rollup_id(granularity: str, bucket: datetime) -> str:
+    return f"{granularity}:{bucket.isoformat()}"
+
+
+class MongoRollupRepository(RollupRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def increment(self, buckets, amounts):
+        await self.increment_many({bucket: amounts for bucket in buckets})
+
+    async def increment_many(self, amounts):
+        operations = [
+            UpdateOne(
+                {"_id": _rollup_id(granularity, bucket)},
+                {"$inc": bucket_amounts, "$setOnInsert": {"granularity": granularity, "bucket": bucket}},
+                upsert=True
+            )
+            for (granularity, bucket), bucket_amounts in amounts.items()
+        ]
+        if not operations:
+            return
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # A concurrent upsert created the bucket first; the retry increments it
+            retry = [operations[error["index"]] for error in e.details.get("writeErrors", []) if error.get("code") == 11000]
+            if len(retry) < len(e.details.get("writeErrors", [])):
+                raise
+            await self.collection.bulk_write(retry, ordered=False)
+
+    async def list_range(self, granularity, start, end):
+        return await self.collection.find(
+            {"granularity": granularity, "bucket": {"$gte": start, "$lt": end}}, {"_id": 0}
+        ).sort("bucket", ASCENDING).to_list(None)
+
+    async def replace_range(self, granularity, start, end, rollups):
+        await self.collection.delete_many({"granularity": granularity, "bucket": {"$gte": start, "$lt": end}})
+        if rollups:
+            await self.collection.insert_many(
+                [{**rollup, "_id": _rollup_id(granularity, rollup["bucket"])} for rollup in rollups], ordered=False
+            )
+
+
+class MongoSubmissionArchiveRepository(SubmissionArchiveRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def store(self, records):
+        if records:
+            await self.collection.bulk_write(
+                [ReplaceOne({"_id": record["id"]}, record, upsert=True) for record in records], ordered=False
+            )
+
+    async def remove(self, ids):
+        if ids:
+            await self.collection.delete_many({"_id": {"$in": ids}})
+
+    async def get_by_reference(self, reference):
+        return await self.collection.find_one({"reference": reference}, {"_id": 0})
+
+    def iter_range(self, start=None, end=None, batch_size=1000):
+        return self.collection.find(
+            _date_range("created_at", start, end), {"_id": 0, "data": 0}
+        ).sort("created_at", 1).batch_size(batch_size)
+
+    async def count_by(self, field):
+        counts = {}
+        async for row in self.collection.aggregate([{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]):
+            counts[str(row["_id"])] = row["count"]
+        return counts
+
+    async def stats(self):
+        async for row in self.collection.aggregate([{"$group": {
+            "_id": None, "count": {"$sum": 1}, "raw_bytes": {"$sum": "$raw_size"}, "stored_bytes": {"$sum": "$size"}
+        }}]):
+            return {"count": row["count"], "raw_bytes": row["raw_bytes"], "stored_bytes": row["stored_bytes"]}
+        return {"count": 0, "raw_bytes": 0, "stored_bytes": 0}
+
+
+class MongoStorage(Storage):
+    """Motor-backed storage. The client is created in connect(), inside the running event loop"""
+
+    name = "mongo"
+
+    def __init__(self, mongo_url: str = None, db_name: str = None, **options):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.options = options
+        self.client = None
+
+    async def connect(self):
+        if self.client is not None:
+            return
+        options = {**client_options(), **self.options}
+        self.client = AsyncIOMotorClient(
+            self.mongo_url or os.environ.get('MONGO_URL'),
+            event_listeners=[mongo_command_metrics, mongo_pool_metrics],
+            **options
+        )
+        self.db = self.client[self.db_name or os.environ.get('DB_NAME', 'notary_service')]
+        self.submissions = MongoSubmissionRepository(self.db.contact_submissions)
+        self.services = MongoServiceRepository(self.db.services, ServiceResponse)
+        self.additional_services = MongoServiceRepository(self.db.additional_services, AdditionalService)
+        self.testimonials = MongoTestimonialRepository(self.db.testimonials)
+        self.configs = MongoConfigRepository(self.db.business_configs)
+        self.subscriptions = MongoSubscriptionRepository(self.db.email_subscriptions)
+        self.rate_limits = MongoRateLimitRepository(self.db.rate_limits)
+        self.idempotency_keys = MongoIdempotencyRepository(self.db.idempotency_keys)
+        self.jobs = MongoJobRepository(self.db.outbox_jobs)
+        self.counters = MongoCounterRepository(self.db.counters)
+        self.rollups = MongoRollupRepository(self.db.submission_rollups)
+        self.submission_archive = MongoSubmissionArchiveRepository(self.db.contact_submissions_archive)
+
+    async def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    async def ready(self) -> dict:
+        if self.client is None:
+            raise RuntimeError("Mongo client not connected")
+        timeout = float(os.environ.get('MONGO_READY_TIMEOUT_MS', '2000')) / 1000
+        start = time.perf_counter()
+        await asyncio.wait_for(self.client.admin.command("ping"), timeout)
+        ping_ms = round((time.perf_counter() - start) * 1000, 2)
+        return {
+            "ping_ms": ping_ms,
+            "read_preference": self.client.read_preference.mongos_mode,
+            "max_pool_size": self.client.options.pool_options.max_pool_size,
+            "pools": mongo_pool_metrics.snapshot(),
+        }
+
+    async def ensure_indexes(self, create: bool = True) -> dict:
+        """Create missing registry indexes and report drift. Safe to run on every startup.
+
+        Raises IndexSetupError after processing every collection if a unique index
+        could not be built: the code relies on those for correctness.
+        """
+        report = {}
+        failed_unique = []
+        for collection_name, models in INDEXES.items():
+            collection = self.db[collection_name]
+            existing = await collection.index_information()
+            result = {"created": [], "missing": [], "mismatched": [], "unexpected": [], "failed": []}
+            expected_names = set()
+
+            for model in models:
+                wanted = model.document
+                name = wanted["name"]
+                expected_names.add(name)
+                if name in existing:
+                    if _index_spec(existing[name]) != _index_spec(wanted):
+                        result["mismatched"].append(name)
+                    continue
+                if not create:
+                    result["missing"].append(name)
+                    continue
+                try:
+                    await collection.create_indexes([model])
+                    result["created"].append(name)
+                except Exception as e:
+                    logging.error("Failed to create index %s.%s: %s", collection_name, name, e)
+                    result["failed"].append(name)
+                    if wanted.get("unique"):
+                        failed_unique.append(f"{collection_name}.{name}")
+
+            result["unexpected"] = sorted(set(existing) - expected_names - {"_id_"})
+            if result["missing"] or result["mismatched"] or result["unexpected"]:
+                logging.warning(
+                    "Index drift on %s: missing=%s mismatched=%s unexpected=%s",
+                    collection_name, result['missing'], result['mismatched'], result['unexpected']
+                )
+            report[collection_name] = result
+        if failed_unique:
+            raise IndexSetupError(
+                f"Unique indexes could not be created: {', '.join(failed_unique)}. "
+                "Remove duplicates with `python manage.py dedupe`", report
+            )
+        return report
@@ -0,0 +1,213 @@
+import os
+import re
+import time
+import fcntl
+import asyncio
+import logging
+import secrets
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+from bson import json_util
+
+
+class WriteBehindQueue:
+    """Buffers documents in an asyncio queue and writes them in batches through ``writer``.
+
+    Every document is appended to an on-disk journal before put() returns, so a
+    process crash never loses an acknowledged write: journal segments that were
+    not confirmed by the writer are replayed on the next start(). ``writer`` must
+    be idempotent (skip documents already stored) for replays to be safe. With
+    ``fsync`` disabled the journal survives process crashes but not host crashes.
+
+    Several processes (e.g. uvicorn workers) can share ``journal_dir``: each
+    journals under its own instance name and holds a lock on it while running,
+    and start() only adopts the files of instances whose lock is free (i.e.
+    whose process has exited).
+    """
+
+    def __init__(self, writer: Callable[[List[dict]], Awaitable[None]], journal_dir: Path,
+                 name: str = "writes", max_batch: int = 100, flush_interval: float = 0.5, fsync: bool = False):
+        self.writer = writer
+        self.journal_dir = Path(journal_dir)
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._segments: List[tuple] = []
+        self._journal = None
+        self._lock_file = None
+        self.instance = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.flush_failures = 0
+
+    @property
+    def journal_path(self) -> Path:
+        return self.journal_dir / f"{self.name}.{self.instance}.journal"
+
+    def _segment_path(self, ns: Optional[int] = None) -> Path:
+        return self.journal_dir / f"{self.name}.{self.instance}.{ns or time.time_ns()}.segment"
+
+    def _open_journal(self):
+        self._journal = open(self.journal_path, "ab", buffering=0)
+
+    def _rotate_journal(self) -> Path:
+        """Seal the active journal as a segment and start a fresh one"""
+        self._journal.close()
+        segment = self._segment_path()
+        os.replace(self.journal_path, segment)
+        self._open_journal()
+        return segment
+
+    def _claim(self, path: Path, ns: Optional[int] = None) -> bool:
+        """Move another instance's journal file into our namespace; the rename is the claim"""
+        ns = ns or time.time_ns()
+        while self._segment_path(ns).exists():
+            ns += 1
+        try:
+            os.replace(path, self._segment_path(ns))
+            return True
+        except FileNotFoundError:
+            return False  # another process claimed it first
+
+    def _adopt_orphans(self):
+        """Claim the journals and segments of instances that are no longer running"""
+        name = re.escape(self.name)
+        # Files from before per-instance journals had no owner lock
+        legacy_journal = self.journal_dir / f"{self.name}.journal"
+        if legacy_journal.exists():
+            self._claim(legacy_journal)
+        for path in self.journal_dir.glob(f"{self.name}.*.segment"):
+            match = re.fullmatch(rf"{name}\.(\d+)\.segment", path.name)
+            if match:
+                self._claim(path, int(match.group(1)))
+
+        for lock_path in self.journal_dir.glob(f"{self.name}.*.lock"):
+            instance = lock_path.name[len(self.name) + 1:-len(".lock")]
+            if instance == self.instance:
+                continue
+            with open(lock_path, "ab") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # that process is still running
+                prefix = f"{self.name}.{instance}."
+                journal = self.journal_dir / f"{prefix}journal"
+                if journal.exists():
+                    self._claim(journal)
+                for path in self.journal_dir.glob(f"{prefix}*.segment"):
+                    self._claim(path, int(path.name[len(prefix):-len(".segment")]))
+                lock_path.unlink(missing_ok=True)
+
+    def _load_segment(self, path: Path) -> List[dict]:
+        documents = []
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    documents.append(json_util.loads(line))
+                except ValueError:
+                    # A torn final line means the write was never acknowledged
+                    logging.warning("Skipping corrupt journal line in %s", path)
+        return documents
+
+    async def start(self):
+        """Recover journal segments left by exited processes and start the flusher"""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.journal_dir / f"{self.name}.{self.instance}.lock", "ab")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._adopt_orphans()
+        for segment in sorted(self.journal_dir.glob(f"{self.name}.{self.instance}.*.segment")):
+            documents = self._load_segment(segment)
+            logging.info("Replaying %s journaled %s writes from %s", len(documents), self.name, segment.name)
+            self._segments.append((segment, documents))
+        self._open_journal()
+        await self.flush()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and drain everything still queued"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        finally:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+            if self._lock_file:
+                # Anything left unflushed is adopted by the next process to start
+                if not self._segments and self._queue.empty():
+                    self.journal_path.unlink(missing_ok=True)
+                    Path(self._lock_file.name).unlink(missing_ok=True)
+                self._lock_file.close()
+                self._lock_file = None
+
+    def put(self, document: dict):
+        """Journal and enqueue a document. Once this returns the write is acknowledged"""
+        self._journal.write(json_util.dumps(document).encode("utf-8") + b"\n")
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._queue.put_nowait(document)
+        self.enqueued += 1
+        if self._queue.qsize() >= self.max_batch:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error("Error flushing %s queue: %s", self.name, e)
+
+    async def flush(self):
+        """Write every queued document, oldest segment first. Failed segments stay on disk for retry"""
+        async with self._lock:
+            documents = []
+            while True:
+                try:
+                    documents.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            # Draining and rotating happen without yielding, so the sealed
+            # segment holds exactly the documents taken off the queue
+            if documents:
+                self._segments.append((self._rotate_journal(), documents))
+
+            while self._segments:
+                segment, documents = self._segments[0]
+                try:
+                    for start in range(0, len(documents), self.max_batch):
+                        await self.writer(documents[start:start + self.max_batch])
+                except Exception as e:
+                    self.flush_failures += 1
+                    logging.error("Failed to flush %s %s writes, will retry: %s", len(documents), self.name, e)
+                    return
+                self.flushed += len(documents)
+                self._segments.pop(0)
+                segment.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "queued": self._queue.qsize(),
+            "pending_segments": len(self._segments),
+            "flush_failures": self.flush_failures,
+        }
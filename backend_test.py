@@ -391,12 +391,12 @@ class BackendTester:
                 if response.status == 200:
                     data = await response.json()
                     
-                    if isinstance(data, list):
+                    if isinstance(data.get("items"), list) and "next_cursor" in data:
                         self.log_test("Contact Submissions Retrieval", True, 
-                                    f"Retrieved {len(data)} contact submissions", data)
+                                    f"Retrieved {len(data['items'])} contact submissions", data)
                     else:
                         self.log_test("Contact Submissions Retrieval", False, 
-                                    "Expected array of submissions", data)
+                                    "Expected page of submissions with items and next_cursor", data)
                 else:
                     self.log_test("Contact Submissions Retrieval", False, 
                                 f"HTTP {response.status}: {await response.text()}")
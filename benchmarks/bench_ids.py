@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: uuid4 ids vs time-sortable ULIDs
+
+Measures id generation cost and, when MONGO_URL is set, insert throughput and
+resulting index size into scratch collections with a unique index on ``id``.
+Random uuid4 keys land all over the B-tree; ULIDs append to its right edge.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/bench_ids.py --docs 200000
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from ids import new_id  # noqa: E402
+
+SCHEMES = {
+    "uuid4": lambda: str(uuid.uuid4()),
+    "ulid": new_id,
+}
+
+
+def bench_generation(count: int) -> dict:
+    results = {}
+    for name, generate in SCHEMES.items():
+        start = time.perf_counter()
+        for _ in range(count):
+            generate()
+        elapsed = time.perf_counter() - start
+        results[name] = {"ids_per_sec": round(count / elapsed), "ns_per_id": round(elapsed / count * 1e9)}
+    return results
+
+
+async def bench_inserts(mongo_url: str, docs: int, batch: int) -> dict:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get("BENCH_DB_NAME", "notary_bench")]
+    results = {}
+    try:
+        for name, generate in SCHEMES.items():
+            collection = db[f"bench_ids_{name}"]
+            await collection.drop()
+            await collection.create_index("id", unique=True)
+            payload = {"name": "Jane Doe", "email": "jane@example.com", "status": "new"}
+
+            start = time.perf_counter()
+            for _ in range(0, docs, batch):
+                await collection.insert_many(
+                    [{"id": generate(), **payload} for _ in range(batch)], ordered=False
+                )
+            elapsed = time.perf_counter() - start
+
+            stats = await db.command("collStats", collection.name)
+            results[name] = {
+                "docs_per_sec": round(docs / elapsed),
+                "seconds": round(elapsed, 3),
+                "id_index_bytes": stats["indexSizes"].get("id_1"),
+            }
+            await collection.drop()
+    finally:
+        client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, default=200_000, help="ids to generate per scheme")
+    parser.add_argument("--docs", type=int, default=100_000, help="documents to insert per scheme")
+    parser.add_argument("--batch", type=int, default=1_000, help="insert_many batch size")
+    args = parser.parse_args()
+
+    report = {"generation": bench_generation(args.ids)}
+    mongo_url = os.environ.get("MONGO_URL")
+    if mongo_url:
+        report["inserts"] = asyncio.run(bench_inserts(mongo_url, args.docs, args.batch))
+    else:
+        report["inserts"] = "skipped (set MONGO_URL to measure insert throughput)"
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Per-request CPU cost of the list endpoints' serialization, before and after the fast path
+
+before: full Mongo documents -> one model per document -> FastAPI response_model
+        validation + serialization -> JSONResponse
+after:  projected documents -> ListEncoder (one TypeAdapter pass) -> JSON bytes
+
+No database is needed; documents are synthesised in the shape Mongo returns them.
+
+    python benchmarks/bench_serialization.py --sizes 10 100 1000
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from bson import ObjectId  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from models import ServiceResponse, Testimonial, ContactSubmission  # noqa: E402
+from serializers import ListEncoder, StoredContactSubmission  # noqa: E402
+
+
+def service_document(i: int) -> dict:
+    return {
+        "_id": ObjectId(), "id": f"service-{i}", "name": "Mobile Notary Service", "base_price": 75.0,
+        "description": "I come to you anywhere in the greater New York area.",
+        "features": ["Same-Day Service", "NYC Metro Area", "Volume Discounts"],
+        "availability": "8 AM - 8 PM", "active": True, "created_at": datetime.utcnow(),
+    }
+
+
+def testimonial_document(i: int) -> dict:
+    return {
+        "_id": ObjectId(), "id": f"testimonial-{i}", "name": "Sarah Johnson", "role": "Real Estate Agent",
+        "content": "Professional, quick, and legally compliant. Highly recommended!", "rating": 5,
+        "date": "2024-01-15", "verified": True, "active": True, "created_at": datetime.utcnow(),
+    }
+
+
+def submission_document(i: int) -> dict:
+    return {
+        "_id": ObjectId(), "id": f"submission-{i}", "name": "John Smith", "email": "john.smith@example.com",
+        "phone": "5551234567", "service_type": "remote", "document_type": "Power of Attorney",
+        "preferred_date": "2024-02-15", "message": "I need to notarize a power of attorney document.",
+        "urgency": "normal", "status": "new", "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        "reference": f"REQ-{i}",
+    }
+
+
+# endpoint -> (response_model, model the fast path encodes with, document factory)
+ENDPOINTS = {
+    "/services": (ServiceResponse, ServiceResponse, service_document),
+    "/testimonials": (Testimonial, Testimonial, testimonial_document),
+    "/contact/submissions": (ContactSubmission, StoredContactSubmission, submission_document),
+}
+
+
+def cpu_per_call(fn, iterations: int) -> float:
+    """Mean CPU microseconds per call"""
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def bench(model, fast_model, make_document, size: int, iterations: int) -> dict:
+    documents = [make_document(i) for i in range(size)]
+    encoder = ListEncoder(fast_model)
+    projected = [{k: v for k, v in doc.items() if k in encoder.projection} for doc in documents]
+    field = create_response_field(name="Response_bench", type_=List[model])
+    loop = asyncio.new_event_loop()
+
+    def before():
+        content = [model(**doc) for doc in documents]
+        value = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return JSONResponse(value).body
+
+    def after():
+        return encoder.encode(projected)
+
+    assert json.loads(before()) == json.loads(after())
+    try:
+        before_us = cpu_per_call(before, iterations)
+        after_us = cpu_per_call(after, iterations)
+    finally:
+        loop.close()
+    return {
+        "before_cpu_us": round(before_us, 1),
+        "after_cpu_us": round(after_us, 1),
+        "speedup": round(before_us / after_us, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="documents per response")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    report = {}
+    for endpoint, (model, fast_model, make_document) in ENDPOINTS.items():
+        report[endpoint] = {
+            str(size): bench(model, fast_model, make_document, size, max(1, args.iterations * 10 // size))
+            for size in args.sizes
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Local load test and throughput benchmark for the backend API
+
+Starts the FastAPI app with uvicorn on a local port (against MONGO_URL with a
+scratch DB_NAME, or the in-memory storage backend with --storage memory), drives every endpoint with a configurable number
+of concurrent clients and prints p50/p95/p99 latency and requests/sec per
+endpoint as JSON. Reports carry the git commit so runs can be compared:
+
+    python benchmarks/load_test.py --requests 2000 --concurrency 50 --output before.json
+    # ...change code...
+    python benchmarks/load_test.py --requests 2000 --concurrency 50 --compare before.json
+
+Use --base-url to benchmark an already running server instead.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import itertools
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+
+CONTACT_PAYLOAD = {
+    "name": "John Smith",
+    "email": "john.smith@example.com",
+    "phone": "5551234567",
+    "service_type": "remote",
+    "document_type": "Power of Attorney",
+    "preferred_date": "2024-02-15",
+    "message": "I need to notarize a power of attorney document for my elderly parent.",
+    "urgency": "normal"
+}
+
+# name -> (method, path, request kwargs factory taking the request sequence number)
+ENDPOINTS = {
+    "health": ("GET", "/", None),
+    "landing": ("GET", "/landing", None),
+    "business_info": ("GET", "/business/info", None),
+    "business_hours": ("GET", "/business/hours", None),
+    "business_stats": ("GET", "/business/stats", None),
+    "services": ("GET", "/services", None),
+    "additional_pricing": ("GET", "/pricing/additional", None),
+    "coverage": ("GET", "/coverage", None),
+    "testimonials": ("GET", "/testimonials", None),
+    "contact_submissions": ("GET", "/contact/submissions", None),
+    "contact_submit": ("POST", "/contact/submit", lambda i: {"json": CONTACT_PAYLOAD}),
+    "email_subscribe": ("POST", "/email/subscribe",
+                        lambda i: {"params": {"email": f"load-{os.getpid()}-{i}@example.com", "source": "load_test"}}),
+}
+
+
+# Request sequence numbers, unique across warmup and measured runs
+SEQUENCE = itertools.count()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """uvicorn running backend/server.py in a subprocess"""
+
+    def __init__(self, port: int, env: Dict[str, str], workers: int = 1):
+        self.port = port
+        self.env = env
+        self.workers = workers
+        self.process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api"
+
+    async def __aenter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=self.env, stdout=sys.stderr
+        )
+        async with aiohttp.ClientSession() as session:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {self.process.returncode}")
+                try:
+                    async with session.get(f"{self.base_url}/") as response:
+                        if response.status == 200:
+                            return self
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError("Server did not become ready within 30s")
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+async def run_endpoint(session: aiohttp.ClientSession, base_url: str, name: str,
+                       requests: int, concurrency: int) -> Dict[str, Any]:
+    method, path, make_kwargs = ENDPOINTS[name]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for _ in counter:
+            kwargs = make_kwargs(next(SEQUENCE)) if make_kwargs else {}
+            start = time.perf_counter()
+            try:
+                async with session.request(method, f"{base_url}{path}", **kwargs) as response:
+                    await response.read()
+                    statuses[str(response.status)] = statuses.get(str(response.status), 0) + 1
+                    if response.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    names = args.endpoints or list(ENDPOINTS)
+    unknown = set(names) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    results = {}
+
+    async def drive(base_url: str):
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for name in names:
+                # Warm caches and connections before measuring
+                await run_endpoint(session, base_url, name, min(args.warmup, args.requests), args.concurrency)
+                results[name] = await run_endpoint(session, base_url, name, args.requests, args.concurrency)
+                print(f"{name}: {results[name]['rps']} req/s, p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+
+    if args.base_url:
+        await drive(args.base_url.rstrip("/"))
+    else:
+        env = dict(os.environ)
+        env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+        env["DB_NAME"] = args.db_name
+        env["STORAGE_BACKEND"] = args.storage
+        # Every simulated client shares one IP; re-enable with --env RATE_LIMIT_ENABLED=true
+        env["RATE_LIMIT_ENABLED"] = "false"
+        env.update(dict(item.split("=", 1) for item in args.env))
+        async with LocalServer(free_port(), env, args.workers) as server:
+            await drive(server.base_url)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "base_url": args.base_url or "local",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "storage": None if args.base_url else args.storage,
+        },
+        "endpoints": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Relative change per endpoint; positive rps and negative latency deltas are improvements"""
+    deltas = {}
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        deltas[name] = {
+            metric: round((current[metric] - previous[metric]) / previous[metric] * 100, 1) if previous[metric] else None
+            for metric in ("rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+    return {"baseline_commit": baseline.get("meta", {}).get("commit"), "percent_change": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per endpoint")
+    parser.add_argument("--endpoints", nargs="+", help=f"subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--base-url", help="benchmark a running server, e.g. http://localhost:8001/api")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--storage", choices=["mongo", "memory"], default="mongo",
+                        help="storage backend for the local server")
+    parser.add_argument("--db-name", default="notary_loadtest", help="scratch database for the local server")
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE", help="extra server environment")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
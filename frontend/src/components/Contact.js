@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from './ui/card';
 import { Button } from './ui/button';
 import { Input } from './ui/input';
@@ -21,6 +21,8 @@ const Contact = () => {
   const [businessHours, setBusinessHours] = useState(null);
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [submitStatus, setSubmitStatus] = useState(null);
+  // One key per form contents: double clicks and retries after a timeout reuse it
+  const idempotencyKey = useRef(null);
 
   useEffect(() => {
     // Load business hours on component mount
@@ -38,6 +40,7 @@ const Contact = () => {
       ...prev,
       [field]: value
     }));
+    idempotencyKey.current = null;
     // Clear submit status when user starts typing again
     if (submitStatus) {
       setSubmitStatus(null);
@@ -62,9 +65,13 @@ const Contact = () => {
         urgency: 'normal'
       };
 
-      const result = await apiService.submitContactForm(apiData);
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      }
+      const result = await apiService.submitContactForm(apiData, idempotencyKey.current);
       
       if (result.success) {
+        idempotencyKey.current = null;
         setSubmitStatus({
           type: 'success',
           message: result.data.message,
@@ -38,10 +38,13 @@ apiClient.interceptors.response.use(
 
 // API service functions
 export const apiService = {
-  // Contact form submission
-  async submitContactForm(formData) {
+  // Contact form submission. Pass the same idempotencyKey when retrying a
+  // submission so the backend returns the original response instead of a duplicate
+  async submitContactForm(formData, idempotencyKey) {
     try {
-      const response = await apiClient.post('/contact/submit', formData);
+      const response = await apiClient.post('/contact/submit', formData, {
+        headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}
+      });
       return {
         success: true,
         data: response.data
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+# Behaviour tests run against the in-process backend; set before database is imported
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+@pytest.fixture
+def storage():
+    """The app's storage, emptied (along with the caches in front of it) for each test"""
+    import database
+    database.storage.__init__()
+    database.config_cache.clear()
+    database.snapshots.invalidate()
+    return database.storage
+
+
+@pytest.fixture
+def client(storage):
+    from fastapi.testclient import TestClient
+    from server import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def add_submission(storage):
+    """Store a submission through the app's write path; keyword arguments override the defaults"""
+    import asyncio
+    import database
+    from models import ContactSubmission
+
+    def add(**fields):
+        fields = {"name": "Jane Doe", "email": "jane@example.com", "phone": "5551234567",
+                  "service_type": "remote", **fields}
+        return asyncio.run(database.save_contact_submission(ContactSubmission(**fields).model_dump()))
+    return add
@@ -0,0 +1,34 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import database
+from analytics import bucket_start
+
+
+def _day_totals(storage, start, end):
+    return {rollup["bucket"]: rollup["total"] for rollup in asyncio.run(storage.rollups.list_range("day", start, end))}
+
+
+def test_default_backfill_leaves_today_open(storage, add_submission):
+    today = bucket_start("day", datetime.utcnow())
+    yesterday = today - timedelta(days=1)
+    add_submission(created_at=yesterday + timedelta(hours=3))
+    add_submission(created_at=today)
+    # A live write landing in today's bucket while the backfill streams
+    asyncio.run(storage.rollups.increment([("day", today)], {"total": 1}))
+
+    result = asyncio.run(database.backfill_submission_rollups())
+    assert result["end"] == today
+    assert _day_totals(storage, yesterday, today + timedelta(days=1)) == {yesterday: 1, today: 2}
+
+
+def test_backfill_rebuilds_the_requested_days(storage, add_submission):
+    day = datetime(2024, 3, 10)
+    add_submission(created_at=day + timedelta(hours=1))
+    add_submission(created_at=day + timedelta(hours=23), service_type="mobile")
+    asyncio.run(storage.rollups.replace_range("day", day, day + timedelta(days=1), []))
+
+    result = asyncio.run(database.backfill_submission_rollups(day, day + timedelta(hours=12)))
+    assert result["end"] == day + timedelta(days=1)
+    rollup, = asyncio.run(storage.rollups.list_range("day", day, day + timedelta(days=1)))
+    assert rollup["total"] == 2 and rollup["service_type"] == {"remote": 1, "mobile": 1}
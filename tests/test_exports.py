@@ -0,0 +1,31 @@
+import json
+import asyncio
+from datetime import datetime
+
+from models import ContactSubmission, EmailSubscription
+
+
+def _ndjson(response):
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_submission_export_accepts_offset_start(storage, client):
+    for day in (1, 2, 3):
+        submission = ContactSubmission(name="Jane Doe", email="jane@example.com", phone="5551234567",
+                                       service_type="remote", created_at=datetime(2024, 1, day, 12))
+        asyncio.run(storage.submissions.insert(submission.model_dump()))
+
+    rows = _ndjson(client.get("/api/contact/submissions/export",
+                              params={"format": "ndjson", "start": "2024-01-02T14:00:00+02:00"}))
+    assert [row["created_at"][:10] for row in rows] == ["2024-01-02", "2024-01-03"]
+
+
+def test_subscription_export_accepts_offset_range(storage, client):
+    for day in (1, 2, 3):
+        subscription = EmailSubscription(email=f"user{day}@example.com", subscribed_at=datetime(2024, 1, day, 12))
+        asyncio.run(storage.subscriptions.subscribe(subscription.model_dump()))
+
+    rows = _ndjson(client.get("/api/email/subscriptions/export",
+                              params={"start": "2024-01-01T12:00:00Z", "end": "2024-01-03T07:00:00-05:00"}))
+    assert [row["email"] for row in rows] == ["user1@example.com", "user2@example.com"]
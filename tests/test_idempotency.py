@@ -0,0 +1,44 @@
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from storage import IDEMPOTENCY_PENDING
+from storage_memory import MemoryIdempotencyRepository
+
+
+def _mongo_repository():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from storage_mongo import MongoIdempotencyRepository
+    return MongoIdempotencyRepository(mongomock_motor.AsyncMongoMockClient()["test"]["idempotency_keys"])
+
+
+REPOSITORIES = {"memory": MemoryIdempotencyRepository, "mongo": _mongo_repository}
+
+
+@pytest.fixture(params=list(REPOSITORIES))
+def repository(request):
+    return REPOSITORIES[request.param]()
+
+
+def test_reserve_claims_new_key(repository):
+    assert asyncio.run(repository.reserve("k", "fp", 10)) is None
+    existing = asyncio.run(repository.reserve("k", "fp", 10))
+    assert existing["status"] == IDEMPOTENCY_PENDING
+    assert existing["fingerprint"] == "fp"
+
+
+def test_reserve_takes_over_expired_record(repository):
+    # The expired record is still stored (Mongo's TTL monitor has not run yet)
+    assert asyncio.run(repository.reserve("k", "old", -1)) is None
+    assert asyncio.run(repository.reserve("k", "new", 10)) is None
+    assert asyncio.run(repository.get("k"))["fingerprint"] == "new"
+
+
+def test_reserve_after_release(repository):
+    asyncio.run(repository.reserve("k", "fp", 10))
+    asyncio.run(repository.release("k"))
+    assert asyncio.run(repository.reserve("k", "fp", 10)) is None
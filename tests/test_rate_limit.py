@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from rate_limit import RateLimiter, RateLimitMiddleware, TokenBucketLimiter, _client_ip
+
+
+def test_bucket_allows_burst_then_refills():
+    limiter = TokenBucketLimiter(rate=2, burst=3)
+    assert [limiter.take("k", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.take("k", now=0) == pytest.approx(0.5)
+    assert limiter.take("k", now=0.5) == 0
+    # Refill is capped at burst
+    assert [limiter.take("k", now=100) for _ in range(4)][-1] > 0
+
+
+def test_bucket_evicts_least_recently_used():
+    limiter = TokenBucketLimiter(rate=0, burst=1, maxsize=2)
+    limiter.take("a", now=0)
+    limiter.take("b", now=0)
+    assert limiter.take("a", now=1) == float("inf")  # a is now the most recent
+    limiter.take("c", now=2)
+    assert limiter.stats()["evictions"] == 1
+    assert limiter.take("b", now=3) == 0  # evicted, so it starts full again
+    assert limiter.take("c", now=3) == float("inf")  # still tracked
+
+
+def _scope(forwarded=(), client=("10.0.0.1", 1234)):
+    return {"headers": [(b"x-forwarded-for", value.encode()) for value in forwarded], "client": client}
+
+
+@pytest.mark.parametrize("forwarded, trusted, expected", [
+    (["1.1.1.1"], 0, "10.0.0.1"),                     # header ignored without trusted proxies
+    (["6.6.6.6, 1.1.1.1"], 1, "1.1.1.1"),             # spoofed left-most entry is skipped
+    (["6.6.6.6, 1.1.1.1, 2.2.2.2"], 2, "1.1.1.1"),
+    (["6.6.6.6", "1.1.1.1, 2.2.2.2"], 2, "1.1.1.1"),  # repeated headers read as one list
+    (["1.1.1.1"], 2, "10.0.0.1"),                      # fewer entries than proxies: not via all of them
+    ([" , 1.1.1.1 "], 1, "1.1.1.1"),
+])
+def test_client_ip(forwarded, trusted, expected):
+    assert _client_ip(_scope(forwarded), trusted) == expected
+
+
+def test_client_ip_without_peer():
+    assert _client_ip(_scope(client=None), 0) is None
+
+
+def test_shared_window_fails_open():
+    async def unavailable(key, window):
+        raise ConnectionError("storage down")
+    limiter = RateLimiter({}, {"ip": TokenBucketLimiter(rate=1, burst=1)}, shared=unavailable)
+    assert asyncio.run(limiter.check("submit", {"ip": "1.1.1.1"})) is None
+
+
+def test_shared_window_rejects_over_limit():
+    async def busy(key, window):
+        return 1000
+    limiter = RateLimiter({}, {"ip": TokenBucketLimiter(rate=1, burst=1)}, shared=busy, shared_window=60)
+    key_type, retry_after = asyncio.run(limiter.check("submit", {"ip": "1.1.1.1"}))
+    assert key_type == "ip" and 0 < retry_after <= 60
+    assert limiter.stats()["rejections"] == {"submit:ip": 1}
+
+
+@pytest.fixture
+def limited_client():
+    app = FastAPI()
+
+    @app.post("/submit")
+    async def submit(payload: dict):
+        return payload
+
+    limiter = RateLimiter(
+        routes={("POST", "/submit"): "submit"},
+        limits={"ip": TokenBucketLimiter(rate=0.01, burst=3), "email": TokenBucketLimiter(rate=0.01, burst=1)},
+    )
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, trusted_proxies=1)
+    return TestClient(app)
+
+
+def test_middleware_limits_per_email_and_replays_the_body(limited_client):
+    response = limited_client.post("/submit", json={"email": " A@x.com", "n": 1})
+    assert response.status_code == 200 and response.json() == {"email": " A@x.com", "n": 1}
+    response = limited_client.post("/submit", json={"email": "a@x.com"}, headers={"X-Forwarded-For": "2.2.2.2"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_middleware_keys_on_the_trusted_hop(limited_client):
+    # The client controls everything left of what the proxy appended
+    for spoofed in ("6.6.6.1", "6.6.6.2", "6.6.6.3"):
+        assert limited_client.post("/submit", json={}, headers={"X-Forwarded-For": f"{spoofed}, 1.1.1.1"}).status_code == 200
+    assert limited_client.post("/submit", json={}, headers={"X-Forwarded-For": "6.6.6.4, 1.1.1.1"}).status_code == 429
+    assert limited_client.post("/submit", json={}, headers={"X-Forwarded-For": "1.1.1.2"}).status_code == 200
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+import retention
+from models import EmailSubscription
+from retention import archive_record, restore_record
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def due(add_submission):
+    """One submission due under each retention rule, and two that are not"""
+    return {
+        "completed": add_submission(status="completed", updated_at=NOW - timedelta(days=100)),
+        "old": add_submission(status="contacted", created_at=NOW - timedelta(days=800)),
+        "recently_completed": add_submission(status="completed", updated_at=NOW - timedelta(days=5)),
+        "open": add_submission(status="new", updated_at=NOW - timedelta(days=100)),
+    }
+
+
+@pytest.mark.parametrize("codec", sorted(retention.ARCHIVE_CODECS))
+def test_archive_round_trip(monkeypatch, codec):
+    monkeypatch.setattr(retention, "ARCHIVE_CODEC", codec)
+    document = {"_id": "x", "id": "1", "reference": "NOT-1", "status": "completed", "message": "a" * 500,
+                "created_at": datetime(2024, 1, 1, 12, 30, 15, 123000), "updated_at": datetime(2024, 2, 1)}
+    record = archive_record(document, NOW)
+    assert record["codec"] == codec and record["size"] < record["raw_size"]
+    assert record["reference"] == "NOT-1" and "message" not in record
+    assert restore_record(record) == {key: value for key, value in document.items() if key != "_id"}
+
+
+def test_report_is_a_dry_run(storage, client, due):
+    report = client.get("/api/retention/report").json()
+    assert report["dry_run"] is True
+    assert report["submissions"]["count"] == 2
+    assert report["submissions"]["by_status"] == {"completed": 1, "contacted": 1}
+    assert report["submissions"]["freed_bytes"] == report["submissions"]["document_bytes"] - report["submissions"]["archived_bytes"]
+    assert asyncio.run(storage.submissions.get_many([due["completed"]["id"]]))
+    assert report["archive"]["count"] == 0
+
+
+def test_apply_moves_due_submissions_to_the_archive(storage, client, due):
+    result = asyncio.run(database.apply_retention())
+    assert result["submissions"] == {"archived": 2, "kept_modified": 0, "batches": 1}
+
+    remaining = {document["id"] for document in asyncio.run(storage.submissions.get_many([s["id"] for s in due.values()]))}
+    assert remaining == {due["recently_completed"]["id"], due["open"]["id"]}
+
+    response = client.get(f"/api/contact/archive/{due['completed']['reference']}")
+    assert response.status_code == 200
+    assert response.json()["id"] == due["completed"]["id"]
+    assert client.get(f"/api/contact/archive/{due['open']['reference']}").status_code == 404
+
+    # Nothing left to do on a second run
+    assert asyncio.run(database.apply_retention())["submissions"]["archived"] == 0
+
+
+def test_archived_submissions_still_count(storage, due):
+    asyncio.run(database.apply_retention())
+    asyncio.run(database.rebuild_business_stats())
+    assert asyncio.run(database.get_business_stats())["total_submissions"] == 4
+
+
+def test_submission_modified_during_apply_is_kept(storage, due, monkeypatch):
+    store = storage.submission_archive.store
+
+    async def store_then_modify(records):
+        await store(records)
+        # An admin edits the submission between the archive copy and the delete
+        await storage.submissions.set_fields([(due["completed"]["id"], {"updated_at": datetime.utcnow()})])
+    monkeypatch.setattr(storage.submission_archive, "store", store_then_modify)
+
+    result = asyncio.run(database.apply_retention(max_batches=1))
+    assert result["submissions"] == {"archived": 1, "kept_modified": 1, "batches": 1}
+    assert asyncio.run(storage.submissions.get_many([due["completed"]["id"]]))
+    assert asyncio.run(storage.submission_archive.get_by_reference(due["completed"]["reference"])) is None
+
+
+def test_unsubscribe_and_expiry_stamping(storage, client):
+    ttl = database.retention_policy.subscription_ttl
+    for email in ("stays@example.com", "leaves@example.com"):
+        asyncio.run(storage.subscriptions.subscribe(EmailSubscription(email=email).model_dump()))
+    # Deactivated before expiry stamping existed: no expires_at yet
+    legacy = EmailSubscription(email="legacy@example.com", active=False, subscribed_at=NOW - timedelta(days=30)).model_dump()
+    storage.subscriptions._by_id[legacy["id"]] = legacy
+
+    response = client.post("/api/email/unsubscribe", params={"email": "leaves@example.com"})
+    assert response.json() == {"success": True, "unsubscribed": True}
+    assert client.post("/api/email/unsubscribe", params={"email": "leaves@example.com"}).json()["unsubscribed"] is False
+
+    report = client.get("/api/retention/report").json()["subscriptions"]
+    assert report == {"active": 1, "inactive": 2, "scheduled_to_expire": 1, "to_schedule": 1}
+
+    assert asyncio.run(database.apply_retention())["subscriptions"] == {"scheduled_to_expire": 1}
+    assert legacy["expires_at"] == legacy["subscribed_at"] + ttl
+    left = storage.subscriptions._by_id[next(id for id, document in storage.subscriptions._by_id.items()
+                                              if document["email"] == "leaves@example.com")]
+    assert left["expires_at"] - left["unsubscribed_at"] - ttl < timedelta(seconds=1)
+
+
+def test_expired_subscriptions_are_dropped(storage):
+    expired = EmailSubscription(email="gone@example.com", active=False,
+                                subscribed_at=NOW - timedelta(days=400)).model_dump()
+    storage.subscriptions._by_id[expired["id"]] = expired
+    storage.subscriptions._order.add((expired["subscribed_at"], expired["id"]))
+    asyncio.run(storage.subscriptions.schedule_expiry(timedelta(days=180)))
+    assert expired["id"] not in storage.subscriptions._by_id
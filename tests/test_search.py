@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+from search import normalize_name, normalize_phone, search_value, submission_search_fields
+
+
+def _search(client, by, q, **params):
+    response = client.get("/api/contact/search", params={"by": by, "q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_fields_are_normalized():
+    fields = submission_search_fields({"name": "  Jane   DOE ", "email": " Jane@Example.COM", "phone": "(555) 123-4567"})
+    assert fields == {"name_lc": "jane doe", "email_lc": "jane@example.com", "phone_digits": "5551234567"}
+    assert normalize_name("JANE\tdoe") == "jane doe"
+    assert normalize_phone("+1 555.123") == "1555123"
+
+
+def test_empty_normalized_query_is_rejected():
+    with pytest.raises(ValueError):
+        search_value("phone", "()-")
+
+
+@pytest.mark.parametrize("by, q", [("name", "  JANE d"), ("email", "JANE@"), ("phone", "555-12")])
+def test_prefix_modes_match_normalized_queries(client, add_submission, by, q):
+    jane = add_submission(name="Jane Doe", email="jane@example.com", phone="(555) 123-4567")
+    add_submission(name="John Roe", email="john@example.com", phone="212 555 0000")
+    assert [item["id"] for item in _search(client, by, q)["items"]] == [jane["id"]]
+
+
+def test_reference_is_exact(client, add_submission):
+    submission = add_submission()
+    assert [item["id"] for item in _search(client, "reference", submission["reference"])["items"]] == [submission["id"]]
+    assert _search(client, "reference", submission["reference"][:-1])["items"] == []
+
+
+def test_text_matches_any_term_newest_first(client, add_submission):
+    old = add_submission(message="Need an apostille", created_at=datetime(2024, 1, 1))
+    new = add_submission(document_type="Power of attorney", created_at=datetime(2024, 2, 1))
+    add_submission(message="Something else")
+    assert [item["id"] for item in _search(client, "text", "apostille attorney")["items"]] == [new["id"], old["id"]]
+
+
+@pytest.mark.parametrize("by, q", [("name", "smith"), ("text", "lease")])
+def test_cursor_pages_through_every_match_once(client, add_submission, by, q):
+    expected = {add_submission(name=f"Smith {i:02}", message="lease agreement", created_at=datetime(2024, 1, i + 1))["id"]
+                for i in range(7)}
+    seen, cursor = [], None
+    while True:
+        page = _search(client, by, q, limit=3, **({"cursor": cursor} if cursor else {}))
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(expected) and set(seen) == expected
+
+
+def test_name_pages_are_alphabetical(client, add_submission):
+    for name in ("Smith Carol", "Smith Alice", "Smith Bob"):
+        add_submission(name=name)
+    items = _search(client, "name", "smith", limit=2)["items"]
+    assert [item["name"] for item in items] == ["Smith Alice", "Smith Bob"]
+
+
+def test_bad_input_is_a_client_error(client, storage):
+    assert client.get("/api/contact/search", params={"by": "phone", "q": "--"}).status_code == 400
+    assert client.get("/api/contact/search", params={"by": "name", "q": "a", "cursor": "garbage"}).status_code == 400
+    assert client.get("/api/contact/search", params={"by": "address", "q": "a"}).status_code == 422
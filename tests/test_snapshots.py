@@ -0,0 +1,24 @@
+import asyncio
+
+import database
+from models import AdditionalService
+
+
+def test_config_version_change_rebuilds_service_snapshots(storage, client):
+    before = client.get("/api/pricing/additional")
+    assert before.json() == []
+
+    # Another worker seeds the collection and bumps the version stamp
+    asyncio.run(storage.additional_services.insert(AdditionalService(service="Witness", price=10.0).model_dump()))
+    version = asyncio.run(storage.configs.bump_version())
+    asyncio.run(database._refresh_config_caches(version))
+
+    after = client.get("/api/pricing/additional")
+    assert [service["service"] for service in after.json()] == ["Witness"]
+    assert after.headers["etag"] != before.headers["etag"]
+
+
+def test_seeding_bumps_config_version(storage):
+    version = asyncio.run(storage.configs.get_version())
+    asyncio.run(database.init_database())
+    assert asyncio.run(storage.configs.get_version()) > version
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+import database
+
+
+def test_status_moves_through_the_workflow(storage, client, add_submission):
+    submission = add_submission()
+    response = client.patch(f"/api/contact/submissions/{submission['id']}/status", json={"status": "contacted"})
+    assert response.status_code == 200
+    assert response.json()["outcome"] == "updated"
+    assert response.json()["status"] == "contacted"
+
+    stored = asyncio.run(storage.submissions.get_many([submission["id"]]))[0]
+    assert stored["status"] == "contacted"
+    assert stored["updated_at"] > submission["updated_at"]
+
+
+def test_stale_updated_at_conflicts(storage, client, add_submission):
+    submission = add_submission()
+    seen = submission["updated_at"].isoformat()
+    assert client.patch(f"/api/contact/submissions/{submission['id']}/status",
+                        json={"status": "contacted", "updated_at": seen}).status_code == 200
+    # A second admin still holding the old updated_at
+    response = client.patch(f"/api/contact/submissions/{submission['id']}/status",
+                            json={"status": "cancelled", "updated_at": seen})
+    assert response.status_code == 409
+    assert asyncio.run(storage.submissions.get_many([submission["id"]]))[0]["status"] == "contacted"
+
+
+@pytest.mark.parametrize("status, code", [("completed", 422), ("new", 200)])
+def test_single_update_errors(client, add_submission, status, code):
+    submission = add_submission()
+    assert client.patch(f"/api/contact/submissions/{submission['id']}/status", json={"status": status}).status_code == code
+
+
+def test_unknown_submission_is_not_found(client, storage):
+    assert client.patch("/api/contact/submissions/missing/status", json={"status": "contacted"}).status_code == 404
+
+
+def test_bulk_update_reports_each_outcome(storage, client, add_submission):
+    new, stale, done = add_submission(), add_submission(), add_submission(status="completed")
+    changes = [
+        {"id": new["id"], "status": "contacted"},
+        {"id": stale["id"], "status": "contacted", "updated_at": "2000-01-01T00:00:00"},
+        {"id": done["id"], "status": "cancelled"},
+        {"id": "missing", "status": "contacted"},
+    ]
+    response = client.patch("/api/contact/submissions/status", json={"updates": changes})
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["outcome"] for result in body["results"]] == ["updated", "conflict", "invalid_transition", "not_found"]
+    assert body["counts"] == {"updated": 1, "conflict": 1, "invalid_transition": 1, "not_found": 1}
+
+
+def test_bulk_update_rejects_repeated_ids(client, add_submission):
+    submission = add_submission()
+    changes = [{"id": submission["id"], "status": "contacted"}] * 2
+    assert client.patch("/api/contact/submissions/status", json={"updates": changes}).status_code == 422
+
+
+def test_transitions_move_counters_and_rollups(storage, add_submission):
+    submission = add_submission()
+    asyncio.run(database.update_submission_statuses([{"id": submission["id"], "status": "contacted"}]))
+
+    counters = asyncio.run(storage.counters.get(database.BUSINESS_STATS_COUNTER))
+    assert counters["by_status"] == {"new": 0, "contacted": 1}
+    day = database.bucket_start("day", submission["created_at"])
+    rollup, = asyncio.run(storage.rollups.list_range("day", day, database.bucket_end("day", day + database.ROLLUP_GRANULARITIES["day"])))
+    assert rollup["status"] == {"new": 0, "contacted": 1}
+
+
+def test_counting_failure_does_not_fail_the_update(storage, client, add_submission, monkeypatch):
+    submission = add_submission()
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("counters unavailable")
+    monkeypatch.setattr(storage.counters, "increment", unavailable)
+    monkeypatch.setattr(storage.rollups, "increment_many", unavailable)
+
+    response = client.patch(f"/api/contact/submissions/{submission['id']}/status", json={"status": "contacted"})
+    assert response.status_code == 200
+    assert response.json()["outcome"] == "updated"
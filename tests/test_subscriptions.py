@@ -0,0 +1,26 @@
+def _subscribe(client, email):
+    response = client.post("/api/email/subscribe", params={"email": email})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_subscribe_ignores_case_and_whitespace(storage, client):
+    assert _subscribe(client, "Jane.Doe@Example.com")["already_subscribed"] is False
+    assert _subscribe(client, " jane.doe@example.COM ")["already_subscribed"] is True
+    assert client.post("/api/email/unsubscribe", params={"email": "JANE.DOE@example.com"}).json()["unsubscribed"] is True
+    assert _subscribe(client, "jane.doe@example.com")["already_subscribed"] is False
+
+
+def test_bulk_subscribe_normalizes_before_deduping(storage, client):
+    _subscribe(client, "existing@example.com")
+    response = client.post("/api/email/subscribe/bulk", json={
+        "emails": [" New@Example.com", "new@example.COM", "EXISTING@example.com", "not-an-email"]
+    })
+    body = response.json()
+    assert [(result["email"], result["outcome"]) for result in body["results"]] == [
+        ("new@example.com", "subscribed"),
+        ("new@example.com", "duplicate"),
+        ("existing@example.com", "already_subscribed"),
+        ("not-an-email", "invalid"),
+    ]
+    assert body["success"] is True
@@ -0,0 +1,112 @@
+import asyncio
+
+from bson import json_util
+
+from write_behind import WriteBehindQueue
+
+
+class Writer:
+    def __init__(self, failures=0):
+        self.documents = []
+        self.failures = failures
+
+    async def __call__(self, documents):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("storage down")
+        self.documents.extend(document["n"] for document in documents)
+
+
+def _queue(tmp_path, writer, **kwargs):
+    return WriteBehindQueue(writer, tmp_path, name="contacts", flush_interval=60, **kwargs)
+
+
+async def _crash(queue):
+    """Drop the process without draining: the flusher stops and the lock is released"""
+    queue._task.cancel()
+    await asyncio.gather(queue._task, return_exceptions=True)
+    queue._journal.close()
+    queue._lock_file.close()
+
+
+def test_flush_writes_in_batches_and_stop_cleans_up(tmp_path):
+    async def run():
+        writer = Writer()
+        queue = _queue(tmp_path, writer, max_batch=2)
+        await queue.start()
+        for n in range(5):
+            queue.put({"n": n})
+        await queue.stop()
+        return writer
+    assert asyncio.run(run()).documents == [0, 1, 2, 3, 4]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_crashed_instance_is_replayed(tmp_path):
+    async def run():
+        crashed = _queue(tmp_path, Writer())
+        await crashed.start()
+        crashed.put({"n": 1})
+        crashed.put({"n": 2})
+        await _crash(crashed)
+
+        writer = Writer()
+        survivor = _queue(tmp_path, writer)
+        await survivor.start()
+        await survivor.stop()
+        return writer
+    assert asyncio.run(run()).documents == [1, 2]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_running_instance_is_not_adopted(tmp_path):
+    async def run():
+        running_writer, other_writer = Writer(failures=1), Writer()
+        running = _queue(tmp_path, running_writer)
+        await running.start()
+        running.put({"n": 1})
+        await running.flush()  # fails, so the segment stays on disk
+
+        other = _queue(tmp_path, other_writer)
+        await other.start()
+        await other.stop()
+        await running.stop()
+        return running_writer, other_writer
+    running_writer, other_writer = asyncio.run(run())
+    assert other_writer.documents == []
+    assert running_writer.documents == [1]
+
+
+def test_failed_flush_is_retried_in_order(tmp_path):
+    async def run():
+        writer = Writer(failures=1)
+        queue = _queue(tmp_path, writer)
+        await queue.start()
+        queue.put({"n": 1})
+        await queue.flush()
+        failed = queue.stats()
+        queue.put({"n": 2})
+        await queue.flush()
+        await queue.stop()
+        return writer, failed, queue.stats()
+    writer, failed, stats = asyncio.run(run())
+    assert failed["pending_segments"] == 1 and failed["flush_failures"] == 1
+    assert writer.documents == [1, 2]
+    assert stats["flushed"] == 2 and stats["pending_segments"] == 0
+
+
+def test_legacy_journal_and_torn_lines_are_recovered(tmp_path):
+    # Written by a version without per-instance journals, cut off mid-line by a crash
+    (tmp_path / "contacts.journal").write_bytes(
+        json_util.dumps({"n": 1}).encode() + b"\n" + json_util.dumps({"n": 2}).encode() + b"\n" + b'{"n": '
+    )
+    (tmp_path / "contacts.123.segment").write_bytes(json_util.dumps({"n": 0}).encode() + b"\n")
+
+    async def run():
+        writer = Writer()
+        queue = _queue(tmp_path, writer)
+        await queue.start()
+        await queue.stop()
+        return writer
+    assert asyncio.run(run()).documents == [0, 1, 2]
+    assert list(tmp_path.iterdir()) == []